@@ -1,23 +1,97 @@
 """Marstek Venus Local (UDP) integration."""
 from __future__ import annotations
 
+from pathlib import Path
+
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
 
-from .const import DOMAIN
+from .const import (
+    CONF_GRID_SENSOR,
+    CONF_GRID_TARGET,
+    CONF_HOLD_LAST_VALUE,
+    DEFAULT_GRID_TARGET,
+    DOMAIN,
+    SERVICE_DUMP_TRACE,
+    SERVICE_SET_MANUAL_SCHEDULE,
+)
+from .controller import ControllerConfig, ZeroExportController
 from .coordinator import MarstekVenusCoordinator
+from .snapshot import VenusSnapshotStore
 
-PLATFORMS: list[str] = ["sensor", "button"]
+PLATFORMS: list[str] = ["sensor", "button", "number"]
+
+# Slot fields are checked by schedule.manual_slot.
+SET_MANUAL_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required("config_entry_id"): str,
+        vol.Required("slots"): [dict],
+    }
+)
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Set up via YAML (not used)."""
+    """Set up via YAML (not used); registers the integration services."""
+
+    async def _async_dump_trace(call: ServiceCall) -> ServiceResponse:
+        """Write each device's request trace as JSON Lines into the config directory."""
+        files: list[str] = []
+        for entry_id, coordinator in hass.data.get(DOMAIN, {}).items():
+            path = Path(hass.config.path(f"{DOMAIN}_{entry_id}_trace.jsonl"))
+            await hass.async_add_executor_job(path.write_text, coordinator.scheduler.trace.as_jsonl(), "utf-8")
+            files.append(str(path))
+        return {"files": files}
+
+    async def _async_set_manual_schedule(call: ServiceCall) -> ServiceResponse:
+        """Program a full manual-mode week; only changed slots are sent."""
+        coordinator: MarstekVenusCoordinator | None = hass.data.get(DOMAIN, {}).get(call.data["config_entry_id"])
+        if coordinator is None:
+            raise HomeAssistantError(f"Unknown Venus config entry {call.data['config_entry_id']}")
+        try:
+            result = await coordinator.async_set_manual_schedule(call.data["slots"])
+        except (KeyError, TypeError, ValueError) as err:
+            raise HomeAssistantError(f"Invalid schedule: {err}") from err
+        if result["failed"]:
+            raise HomeAssistantError(f"Slots {result['failed']} were not confirmed by the device")
+        return result
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_DUMP_TRACE, _async_dump_trace, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_MANUAL_SCHEDULE,
+        _async_set_manual_schedule,
+        schema=SET_MANUAL_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate old config entries."""
+    if entry.version == 1:
+        # v1 created a "_stable" twin of most sensors; the sensors now hold their
+        # last value themselves. The plain entities keep their registry entries
+        # (entity_id, user customisations); only the twins go.
+        registry = er.async_get(hass)
+        for reg_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+            if reg_entry.unique_id.endswith("_stable"):
+                registry.async_remove(reg_entry.entity_id)
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, CONF_HOLD_LAST_VALUE: True}, version=2
+        )
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Marstek Venus from a config entry."""
     coordinator = MarstekVenusCoordinator(hass, entry)
+    await coordinator.async_restore_snapshot()
     await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
@@ -25,11 +99,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if grid_sensor := entry.options.get(CONF_GRID_SENSOR):
+        cfg = ControllerConfig(target=entry.options.get(CONF_GRID_TARGET, DEFAULT_GRID_TARGET))
+        coordinator.controller = ZeroExportController(hass, coordinator, grid_sensor, cfg)
+        coordinator.controller.async_start()
+        entry.async_on_unload(coordinator.controller.async_stop)
+
+    coordinator.async_start()
     return True
 
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update: reload integration."""
+    """Handle options update: reload integration.
+
+    Data-only updates (the coordinator re-binding to a new address) apply in place.
+    """
+    coordinator: MarstekVenusCoordinator | None = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is not None and coordinator.options == dict(entry.options):
+        return
     await hass.config_entries.async_reload(entry.entry_id)
 
 
@@ -40,3 +128,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         coordinator: MarstekVenusCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
         await coordinator.async_close()
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the entry's persisted snapshot."""
+    await VenusSnapshotStore(hass, entry.entry_id).async_remove()
@@ -0,0 +1,185 @@
+# custom_components/marstek_venus_local/aggregates.py
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class AggregateSpec:
+    """One rolling statistic of a data field, published as ``{data key}_agg.{key}``."""
+
+    key: str
+    # "<data key>.<field>", like entity paths
+    field: str
+    # seconds
+    window: float
+    # "mean", "min", "max" or "p<percent>", e.g. "p95"
+    stat: str
+    # Histogram range and resolution (low, high, step) for percentiles.
+    sketch: tuple[float, float, float] | None = None
+
+
+_POWER_SKETCH = (-5000.0, 5000.0, 10.0)
+# Histogram buckets per block (see HistogramSketch).
+_BLOCK = 32
+
+AGGREGATES: tuple[AggregateSpec, ...] = (
+    AggregateSpec("ongrid_power_mean_5m", "es.ongrid_power", 300, "mean"),
+    AggregateSpec("ongrid_power_min_5m", "es.ongrid_power", 300, "min"),
+    AggregateSpec("ongrid_power_max_5m", "es.ongrid_power", 300, "max"),
+    AggregateSpec("ongrid_power_p95_1h", "es.ongrid_power", 3600, "p95", _POWER_SKETCH),
+    AggregateSpec("bat_temp_min_24h", "bat.bat_temp", 86400, "min"),
+    AggregateSpec("bat_temp_max_24h", "bat.bat_temp", 86400, "max"),
+)
+
+# Data keys that have aggregates.
+AGGREGATE_KEYS = tuple(dict.fromkeys(spec.field.split(".", 1)[0] for spec in AGGREGATES))
+
+
+class HistogramSketch:
+    """Fixed-bucket histogram that supports removal, for windowed percentiles.
+
+    Memory is one counter per bucket whatever the window holds; answers
+    are accurate to one bucket. Values outside the range count in the
+    first/last bucket. Buckets are also counted in blocks of _BLOCK, so a
+    lookup walks the blocks and then one block instead of every bucket.
+    """
+
+    __slots__ = ("_low", "_step", "_counts", "_blocks", "count")
+
+    def __init__(self, low: float, high: float, step: float) -> None:
+        self._low = low
+        self._step = step
+        self._counts = [0] * max(1, int((high - low) / step))
+        self._blocks = [0] * ((len(self._counts) + _BLOCK - 1) // _BLOCK)
+        self.count = 0
+
+    def _bucket(self, value: float) -> int:
+        return min(max(int((value - self._low) // self._step), 0), len(self._counts) - 1)
+
+    def add(self, value: float) -> None:
+        index = self._bucket(value)
+        self._counts[index] += 1
+        self._blocks[index // _BLOCK] += 1
+        self.count += 1
+
+    def remove(self, value: float) -> None:
+        index = self._bucket(value)
+        self._counts[index] -= 1
+        self._blocks[index // _BLOCK] -= 1
+        self.count -= 1
+
+    def percentile(self, q: float) -> float | None:
+        """Midpoint of the bucket holding the q-quantile (0 <= q <= 1)."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for block, block_count in enumerate(self._blocks):
+            if seen + block_count > rank:
+                index = block * _BLOCK
+                while True:
+                    seen += self._counts[index]
+                    if seen > rank:
+                        return self._low + (index + 0.5) * self._step
+                    index += 1
+            seen += block_count
+        return self._low + (len(self._counts) - 0.5) * self._step
+
+
+class WindowStats:
+    """Mean, min, max (and optionally percentiles) over the last ``window`` seconds.
+
+    Min and max come from monotonic deques and the mean from a running sum,
+    so adding a sample costs O(1) amortised.
+    """
+
+    __slots__ = ("window", "_samples", "_min", "_max", "_sum", "_sketch")
+
+    def __init__(self, window: float, sketch: HistogramSketch | None = None) -> None:
+        self.window = window
+        self._samples: deque[tuple[float, float]] = deque()
+        # Candidates for the minimum (values increasing) and maximum (decreasing).
+        self._min: deque[tuple[float, float]] = deque()
+        self._max: deque[tuple[float, float]] = deque()
+        self._sum = 0.0
+        self._sketch = sketch
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, ts: float, value: float) -> None:
+        sample = (ts, value)
+        self._samples.append(sample)
+        self._sum += value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append(sample)
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append(sample)
+        if self._sketch is not None:
+            self._sketch.add(value)
+        self.expire(ts)
+
+    def expire(self, now: float) -> None:
+        cutoff = now - self.window
+        samples = self._samples
+        while samples and samples[0][0] <= cutoff:
+            sample = samples.popleft()
+            self._sum -= sample[1]
+            if self._min[0] is sample:
+                self._min.popleft()
+            if self._max[0] is sample:
+                self._max.popleft()
+            if self._sketch is not None:
+                self._sketch.remove(sample[1])
+        if not samples:
+            self._sum = 0.0  # drop accumulated rounding
+
+    def value(self, stat: str) -> float | None:
+        if not self._samples:
+            return None
+        if stat == "mean":
+            return round(self._sum / len(self._samples), 1)
+        if stat == "min":
+            return self._min[0][1]
+        if stat == "max":
+            return self._max[0][1]
+        if stat.startswith("p") and self._sketch is not None:
+            return self._sketch.percentile(int(stat[1:]) / 100)
+        raise ValueError(f"Unknown statistic {stat}")
+
+
+class Aggregates:
+    """Rolling statistics per data key; fed with each decoded poll result."""
+
+    def __init__(self, specs: tuple[AggregateSpec, ...] = AGGREGATES) -> None:
+        # Specs sharing field and window share one WindowStats.
+        grouped: dict[tuple[str, float], list[AggregateSpec]] = {}
+        for spec in specs:
+            grouped.setdefault((spec.field, spec.window), []).append(spec)
+        self._by_key: dict[str, list[tuple[str, WindowStats, list[AggregateSpec]]]] = {}
+        for (path, window_len), window_specs in grouped.items():
+            sketch = next((s.sketch for s in window_specs if s.sketch is not None), None)
+            window = WindowStats(window_len, HistogramSketch(*sketch) if sketch is not None else None)
+            key, name = path.split(".", 1)
+            self._by_key.setdefault(key, []).append((name, window, window_specs))
+
+    def record(self, key: str, status: Any, ts: float) -> dict[str, float | None] | None:
+        """Fold a ``key`` result sampled at ``ts`` (monotonic) in; the key's current aggregates."""
+        windows = self._by_key.get(key)
+        if windows is None or status is None:
+            return None
+        out: dict[str, float | None] = {}
+        for name, window, specs in windows:
+            value = status.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                window.add(ts, value)
+            else:
+                window.expire(ts)
+            for spec in specs:
+                out[spec.key] = window.value(spec.stat)
+        return out
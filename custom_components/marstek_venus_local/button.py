@@ -4,7 +4,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -32,7 +32,7 @@ async def async_setup_entry(
 ) -> None:
     coordinator: MarstekVenusCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    device_identifier = f"{coordinator.host}:{coordinator.port}"
+    device_identifier = coordinator.device_identifier
     device_info = DeviceInfo(
         identifiers={(DOMAIN, device_identifier)},
         name="Marstek Venus E 3.0",
@@ -43,7 +43,7 @@ async def async_setup_entry(
     entities: list[ButtonEntity] = [
         MarstekVenusModeButton(coordinator, device_identifier, device_info, desc) for desc in BUTTONS
     ]
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class MarstekVenusModeButton(CoordinatorEntity[MarstekVenusCoordinator], ButtonEntity):
@@ -63,13 +63,23 @@ class MarstekVenusModeButton(CoordinatorEntity[MarstekVenusCoordinator], ButtonE
         self._attr_unique_id = f"{device_identifier}:{desc.key}"
         self._attr_name = f"Venus {desc.name}"
 
+        self._written_available: bool | None = None
+
     @property
     def device_info(self) -> DeviceInfo:
         return self._device_info
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Buttons carry no data; only availability can change.
+        if self.available == self._written_available:
+            return
+        self._written_available = self.available
+        self.async_write_ha_state()
+
     async def async_press(self) -> None:
+        # The read-back that verifies the mode also updates the mode sensor.
         ok = await self.coordinator.async_set_mode(self.entity_description.mode)
-        await self.coordinator.async_request_refresh()
         if not ok:
             self.coordinator.logger.warning(
                 "Failed to set mode to %s", self.entity_description.mode
@@ -0,0 +1,86 @@
+# custom_components/marstek_venus_local/capabilities.py
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+STORAGE_KEY = f"{DOMAIN}.capabilities"
+STORAGE_VERSION = 1
+
+DATA_CAPABILITIES = f"{DOMAIN}_capabilities"
+
+# Cached results older than this are probed again.
+CAPABILITY_MAX_AGE = timedelta(days=7)
+
+
+def device_identity(device_info: dict[str, Any] | None) -> str | None:
+    """Cache key for a device/firmware pair, from a Marstek.GetDevice result."""
+    if not isinstance(device_info, dict):
+        return None
+    mac = device_info.get("wifi_mac") or device_info.get("ble_mac")
+    ver = device_info.get("ver")
+    if not mac or ver is None:
+        return None
+    return f"{mac}:{ver}"
+
+
+def firmware_identity(device_info: dict[str, Any] | None) -> str | None:
+    """Model/firmware key shared by identical units, so a fleet probes each firmware once."""
+    if not isinstance(device_info, dict):
+        return None
+    model = device_info.get("device")
+    ver = device_info.get("ver")
+    if not model or ver is None:
+        return None
+    return f"{model}:{ver}"
+
+
+class VenusCapabilityCache:
+    """Unsupported RPC methods per device serial/firmware, persisted in HA storage."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._devices: dict[str, dict[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _async_ensure_loaded(self) -> dict[str, dict[str, Any]]:
+        async with self._lock:
+            if self._devices is None:
+                stored = await self._store.async_load() or {}
+                self._devices = dict(stored.get("devices", {}))
+            return self._devices
+
+    async def async_get(self, *identities: str | None) -> set[str] | None:
+        """First fresh cached result among ``identities`` (most specific first)."""
+        devices = await self._async_ensure_loaded()
+        oldest = dt_util.utcnow() - CAPABILITY_MAX_AGE
+        for identity in identities:
+            entry = devices.get(identity) if identity else None
+            if entry is None:
+                continue
+            checked = dt_util.parse_datetime(entry.get("checked") or "")
+            if checked is not None and checked >= oldest:
+                return set(entry.get("unsupported", []))
+        return None
+
+    async def async_set(self, identities: tuple[str | None, ...], unsupported: set[str]) -> None:
+        devices = await self._async_ensure_loaded()
+        checked = dt_util.utcnow().isoformat()
+        for identity in identities:
+            if identity:
+                devices[identity] = {"unsupported": sorted(unsupported), "checked": checked}
+        await self._store.async_save({"devices": devices})
+
+
+def async_get_capability_cache(hass: HomeAssistant) -> VenusCapabilityCache:
+    cache: VenusCapabilityCache | None = hass.data.get(DATA_CAPABILITIES)
+    if cache is None:
+        cache = hass.data[DATA_CAPABILITIES] = VenusCapabilityCache(hass)
+    return cache
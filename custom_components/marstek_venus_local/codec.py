@@ -0,0 +1,48 @@
+# custom_components/marstek_venus_local/codec.py
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # orjson ships with Home Assistant; plain json keeps the scripts dependency-free
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def decode(data: bytes) -> Any:
+    """Parse one datagram; raises ValueError if it is not JSON."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class RequestEncoder:
+    """Serialises JSON-RPC requests, reusing the bytes after the id.
+
+    Everything but the id is fixed per method and params object, so the
+    tail is cached (one entry per method, keyed on the params' identity)
+    and only the id is formatted per request. Params must not be mutated
+    after they were sent; build a new dict instead.
+    """
+
+    def __init__(self) -> None:
+        self._tails: dict[str, tuple[dict[str, Any] | None, bytes]] = {}
+
+    def encode(self, rpc_id: int, method: str, params: dict[str, Any] | None) -> bytes:
+        cached = self._tails.get(method)
+        if cached is None or cached[0] is not params:
+            body: dict[str, Any] = {"method": method}
+            if params is not None:
+                body["params"] = params
+            # '{"method":...}' -> ',"method":...}'
+            cached = self._tails[method] = (params, b"," + _dumps(body)[1:])
+        return b'{"id":%d%b' % (rpc_id, cached[1])
@@ -4,36 +4,46 @@ from __future__ import annotations
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.const import CONF_HOST, CONF_MAC, CONF_PORT
 from homeassistant.data_entry_flow import FlowResult
 
 from .const import (
     DOMAIN,
     DEFAULT_PORT,
-    DEFAULT_LOOP_INTERVAL,
-    DEFAULT_ES_STATUS_INTERVAL,
-    DEFAULT_BAT_STATUS_INTERVAL,
-    DEFAULT_ES_MODE_INTERVAL,
     DEFAULT_MIN_REQUEST_GAP,
     DEFAULT_UDP_TIMEOUT,
-    CONF_LOOP_INTERVAL,
-    CONF_ES_STATUS_INTERVAL,
-    CONF_BAT_STATUS_INTERVAL,
-    CONF_ES_MODE_INTERVAL,
+    DEFAULT_HOLD_LAST_VALUE,
+    DEFAULT_GRID_TARGET,
     CONF_MIN_REQUEST_GAP,
     CONF_UDP_TIMEOUT,
+    CONF_HOLD_LAST_VALUE,
+    CONF_GRID_SENSOR,
+    CONF_GRID_TARGET,
 )
 from .coordinator import async_test_udp_connection
-from .discovery import async_discover_devices
+from .discovery import (
+    async_discover_devices,
+    async_get_discovery_cache,
+    device_mac,
+    sweep_hosts,
+)
+from .methods import POLL_METHODS, default_interval_options
 
 CONF_DEVICE = "device"
+CONF_SUBNET = "subnet"
 DEVICE_MANUAL = "__manual__"
+DEVICE_SCAN = "__scan__"
+DEVICE_REFRESH = "__refresh__"
 
 DISCOVERY_TIMEOUT = 2.0  # seconds
+DISCOVERY_IDLE = 0.5  # stop once devices were found and nobody else answered for this long
 
 
 class MarstekVenusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
-    VERSION = 1
+    VERSION = 2
+
+    def __init__(self) -> None:
+        self._devices: list[dict] | None = None
 
     async def async_step_user(self, user_input: dict | None = None) -> FlowResult:
         """Start with discovery list, allow manual IP fallback."""
@@ -44,32 +54,47 @@ class MarstekVenusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             choice = user_input[CONF_DEVICE]
             if choice == DEVICE_MANUAL:
                 return await self.async_step_manual()
+            if choice == DEVICE_SCAN:
+                return await self.async_step_scan()
+            if choice == DEVICE_REFRESH:
+                self._devices = await self._async_discover()
+                return await self.async_step_user()
 
             host = choice
-            port = DEFAULT_PORT
+            device = next((d for d in self._devices or [] if d.get("ip") == host), {})
+            port = int(device.get("port", DEFAULT_PORT))
+            mac = device_mac(device)
 
             ok = await async_test_udp_connection(self.hass, host, port, DEFAULT_UDP_TIMEOUT)
             if not ok:
                 errors["base"] = "cannot_connect"
             else:
-                await self.async_set_unique_id(f"{host}:{port}")
+                # Keyed by MAC when known, so the entry survives the unit changing address.
+                await self.async_set_unique_id(mac or f"{host}:{port}")
                 self._abort_if_unique_id_configured()
+                self._async_abort_entries_match({CONF_HOST: host, CONF_PORT: port})
 
+                data = {CONF_HOST: host, CONF_PORT: port}
+                if mac:
+                    data[CONF_MAC] = mac
                 return self.async_create_entry(
                     title=f"Marstek Venus ({host})",
-                    data={CONF_HOST: host, CONF_PORT: port},
+                    data=data,
                     options={
-                        CONF_LOOP_INTERVAL: DEFAULT_LOOP_INTERVAL,
-                        CONF_ES_STATUS_INTERVAL: DEFAULT_ES_STATUS_INTERVAL,
-                        CONF_BAT_STATUS_INTERVAL: DEFAULT_BAT_STATUS_INTERVAL,
-                        CONF_ES_MODE_INTERVAL: DEFAULT_ES_MODE_INTERVAL,
+                        **default_interval_options(),
                         CONF_MIN_REQUEST_GAP: DEFAULT_MIN_REQUEST_GAP,
                         CONF_UDP_TIMEOUT: DEFAULT_UDP_TIMEOUT,
+                        CONF_HOLD_LAST_VALUE: DEFAULT_HOLD_LAST_VALUE,
                     },
                 )
 
-        # Discovery (build choices)
-        devices = await async_discover_devices(self.hass, DEFAULT_PORT, DISCOVERY_TIMEOUT)
+        # Known units show up instantly; otherwise (or on request) discover live.
+        # A subnet scan leaves its results here too.
+        if self._devices is None:
+            self._devices = await async_get_discovery_cache(self.hass).async_devices()
+            if not self._devices:
+                self._devices = await self._async_discover()
+        devices = self._devices
 
         choices: dict[str, str] = {}
         for d in devices:
@@ -85,6 +110,8 @@ class MarstekVenusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 label_parts.append(str(d["name"]))
             elif d.get("model"):
                 label_parts.append(str(d["model"]))
+            elif d.get("device"):
+                label_parts.append(str(d["device"]))
             elif d.get("serial"):
                 label_parts.append(f"SN {d['serial']}")
             elif d.get("sn"):
@@ -92,7 +119,9 @@ class MarstekVenusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             choices[ip] = " - ".join(label_parts)
 
-        # Always include manual fallback
+        # Always include rediscovery, subnet scan and manual fallback
+        choices[DEVICE_REFRESH] = "Erneut suchen"
+        choices[DEVICE_SCAN] = "Subnetz durchsuchen"
         choices[DEVICE_MANUAL] = "Manual IP eingeben"
 
         schema = vol.Schema(
@@ -103,6 +132,38 @@ class MarstekVenusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
 
+    async def _async_discover(self, subnet: str | None = None) -> list[dict]:
+        """Live discovery; results also refresh the discovery cache."""
+        # A sweep takes a while, so only plain broadcast discovery stops early.
+        found = await async_discover_devices(
+            self.hass,
+            DEFAULT_PORT,
+            DISCOVERY_TIMEOUT,
+            subnet=subnet,
+            idle=None if subnet else DISCOVERY_IDLE,
+        )
+        await async_get_discovery_cache(self.hass).async_remember(found, DEFAULT_PORT)
+        return found
+
+    async def async_step_scan(self, user_input: dict | None = None) -> FlowResult:
+        """Unicast sweep of a subnet broadcast does not reach (other VLAN)."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            subnet = user_input[CONF_SUBNET]
+            try:
+                sweep_hosts(subnet)
+            except ValueError:
+                errors["base"] = "invalid_subnet"
+            else:
+                found = await self._async_discover(subnet)
+                known = {d.get("ip") for d in self._devices or []}
+                self._devices = [*(self._devices or []), *(d for d in found if d.get("ip") not in known)]
+                return await self.async_step_user()
+
+        schema = vol.Schema({vol.Required(CONF_SUBNET): str})
+        return self.async_show_form(step_id="scan", data_schema=schema, errors=errors)
+
     async def async_step_manual(self, user_input: dict | None = None) -> FlowResult:
         """Manual IP entry fallback."""
         errors: dict[str, str] = {}
@@ -117,17 +178,16 @@ class MarstekVenusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 await self.async_set_unique_id(f"{host}:{port}")
                 self._abort_if_unique_id_configured()
+                self._async_abort_entries_match({CONF_HOST: host, CONF_PORT: port})
 
                 return self.async_create_entry(
                     title=f"Marstek Venus ({host})",
                     data={CONF_HOST: host, CONF_PORT: port},
                     options={
-                        CONF_LOOP_INTERVAL: DEFAULT_LOOP_INTERVAL,
-                        CONF_ES_STATUS_INTERVAL: DEFAULT_ES_STATUS_INTERVAL,
-                        CONF_BAT_STATUS_INTERVAL: DEFAULT_BAT_STATUS_INTERVAL,
-                        CONF_ES_MODE_INTERVAL: DEFAULT_ES_MODE_INTERVAL,
+                        **default_interval_options(),
                         CONF_MIN_REQUEST_GAP: DEFAULT_MIN_REQUEST_GAP,
                         CONF_UDP_TIMEOUT: DEFAULT_UDP_TIMEOUT,
+                        CONF_HOLD_LAST_VALUE: DEFAULT_HOLD_LAST_VALUE,
                     },
                 )
 
@@ -154,32 +214,38 @@ class MarstekVenusOptionsFlowHandler(config_entries.OptionsFlow):
 
         opts = self.entry.options
 
+        fields: dict = {
+            vol.Required(
+                m.interval_option,
+                default=opts.get(m.interval_option, m.default_interval),
+            ): vol.Coerce(int)
+            for m in POLL_METHODS
+        }
+
         schema = vol.Schema(
             {
-                vol.Required(
-                    CONF_LOOP_INTERVAL,
-                    default=opts.get(CONF_LOOP_INTERVAL, DEFAULT_LOOP_INTERVAL),
-                ): vol.Coerce(int),
-                vol.Required(
-                    CONF_ES_STATUS_INTERVAL,
-                    default=opts.get(CONF_ES_STATUS_INTERVAL, DEFAULT_ES_STATUS_INTERVAL),
-                ): vol.Coerce(int),
-                vol.Required(
-                    CONF_BAT_STATUS_INTERVAL,
-                    default=opts.get(CONF_BAT_STATUS_INTERVAL, DEFAULT_BAT_STATUS_INTERVAL),
-                ): vol.Coerce(int),
-                vol.Required(
-                    CONF_ES_MODE_INTERVAL,
-                    default=opts.get(CONF_ES_MODE_INTERVAL, DEFAULT_ES_MODE_INTERVAL),
-                ): vol.Coerce(int),
+                **fields,
                 vol.Required(
                     CONF_MIN_REQUEST_GAP,
                     default=opts.get(CONF_MIN_REQUEST_GAP, DEFAULT_MIN_REQUEST_GAP),
-                ): vol.Coerce(int),
+                ): vol.Coerce(float),
                 vol.Required(
                     CONF_UDP_TIMEOUT,
                     default=opts.get(CONF_UDP_TIMEOUT, DEFAULT_UDP_TIMEOUT),
                 ): vol.Coerce(float),
+                vol.Required(
+                    CONF_HOLD_LAST_VALUE,
+                    default=opts.get(CONF_HOLD_LAST_VALUE, DEFAULT_HOLD_LAST_VALUE),
+                ): bool,
+                # Zero-export controller; off while no grid sensor is set.
+                vol.Optional(
+                    CONF_GRID_SENSOR,
+                    description={"suggested_value": opts.get(CONF_GRID_SENSOR)},
+                ): str,
+                vol.Required(
+                    CONF_GRID_TARGET,
+                    default=opts.get(CONF_GRID_TARGET, DEFAULT_GRID_TARGET),
+                ): vol.Coerce(int),
             }
         )
 
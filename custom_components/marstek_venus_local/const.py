@@ -2,25 +2,47 @@ from __future__ import annotations
 
 DOMAIN = "marstek_venus_local"
 
-CONF_LOOP_INTERVAL = "loop_interval"
 CONF_ES_STATUS_INTERVAL = "es_status_interval"
 CONF_BAT_STATUS_INTERVAL = "bat_status_interval"
 CONF_ES_MODE_INTERVAL = "es_mode_interval"
+CONF_EM_STATUS_INTERVAL = "em_status_interval"
+CONF_PV_STATUS_INTERVAL = "pv_status_interval"
+CONF_WIFI_STATUS_INTERVAL = "wifi_status_interval"
+CONF_DEVICE_INFO_INTERVAL = "device_info_interval"
 CONF_MIN_REQUEST_GAP = "min_request_gap"
 CONF_UDP_TIMEOUT = "udp_timeout"
+CONF_HOLD_LAST_VALUE = "hold_last_value"
+CONF_GRID_SENSOR = "grid_sensor"
+CONF_GRID_TARGET = "grid_target"
 
 DEFAULT_PORT = 30000
 
-# Coordinator tick (seconds). Each tick performs at most ONE UDP request (if due).
-DEFAULT_LOOP_INTERVAL = 2
+SERVICE_DUMP_TRACE = "dump_trace"
+SERVICE_SET_POWER = "set_power"
+SERVICE_SET_MANUAL_SCHEDULE = "set_manual_schedule"
 
 # Per-method fetch intervals (seconds)
 DEFAULT_ES_STATUS_INTERVAL = 30
 DEFAULT_BAT_STATUS_INTERVAL = 60
 DEFAULT_ES_MODE_INTERVAL = 600  # 10 minutes
+DEFAULT_EM_STATUS_INTERVAL = 30
+DEFAULT_PV_STATUS_INTERVAL = 60
+DEFAULT_WIFI_STATUS_INTERVAL = 300
+DEFAULT_DEVICE_INFO_INTERVAL = 3600
 
-# Minimum time between UDP requests (seconds)
+# Minimum time between UDP requests (seconds, fractions allowed)
 DEFAULT_MIN_REQUEST_GAP = 2
 
-# UDP socket timeout (seconds)
+# UDP timeout ceiling (seconds); the actual timeout adapts to the measured RTT
 DEFAULT_UDP_TIMEOUT = 2.0
+
+# Keep showing the last good value when a field is missing or the device is unreachable
+DEFAULT_HOLD_LAST_VALUE = True
+
+# Passive power control: setpoint limit (W, both directions) and how long the
+# device holds a setpoint before falling back (seconds)
+PASSIVE_POWER_MAX = 2500
+DEFAULT_PASSIVE_CD_TIME = 300
+
+# Zero-export controller: grid power to hold (W, positive = import)
+DEFAULT_GRID_TARGET = 0
@@ -0,0 +1,213 @@
+# custom_components/marstek_venus_local/controller.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfPower
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
+
+from .const import PASSIVE_POWER_MAX
+
+if TYPE_CHECKING:
+    from .coordinator import MarstekVenusCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class ControllerConfig:
+    # Grid power to hold (W, positive = import).
+    target: float = 0.0
+    # PI gains: proportional (W per W of error) and integral (per second).
+    kp: float = 0.3
+    ki: float = 0.4
+    # Errors within this band (W) leave the setpoint alone.
+    deadband: float = 25.0
+    # Largest setpoint change per second of meter time (W/s).
+    slew_rate: float = 800.0
+    max_power: int = PASSIVE_POWER_MAX
+    # No discharging at or below soc_min, no charging at or above soc_max (%).
+    soc_min: float = 11.0
+    soc_max: float = 100.0
+    # Outside this battery temperature range (°C) the setpoint is forced to 0.
+    temp_min: float = 0.0
+    temp_max: float = 50.0
+    # Longest meter gap folded into one step (seconds).
+    max_dt: float = 10.0
+    # Countdown sent with every setpoint; the unit falls back on its own if we stop.
+    cd_time: int = 60
+
+
+def _flag_cleared(value: Any) -> bool:
+    """Whether a Bat.GetStatus charge/discharge flag says no (JSON false, 0 or "false")."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("false", "0", "no")
+    return isinstance(value, (int, float)) and not value
+
+
+class PiController:
+    """PI loop from measured grid power to a passive setpoint.
+
+    Velocity form: each meter reading moves the last output by
+    ``kp * Δerror + ki * dt * error``, so clamping the output (power limit,
+    SOC/temperature guards) cannot wind up an integral term. The output is
+    positive for discharge, which lowers grid import one to one. Works on
+    plain numbers so it can be driven outside Home Assistant.
+    """
+
+    def __init__(self, cfg: ControllerConfig) -> None:
+        self.cfg = cfg
+        self.output = 0.0
+        self._error: float | None = None
+        self._last: float | None = None
+        # Which limit clamped the last output, for diagnostics.
+        self.limited: str | None = None
+
+    def limits(self, bat: Any) -> tuple[float, float, str | None]:
+        """Allowed setpoint range for the given ``bat`` snapshot, and the guard that narrowed it."""
+        cfg = self.cfg
+        low, high = -float(cfg.max_power), float(cfg.max_power)
+        reason: str | None = None
+        if bat is None:
+            return low, high, reason
+        soc = bat.get("soc")
+        temp = bat.get("bat_temp")
+        if (soc is not None and soc <= cfg.soc_min) or _flag_cleared(bat.get("dischrg_flag")):
+            high, reason = 0.0, "soc_low"
+        if (soc is not None and soc >= cfg.soc_max) or _flag_cleared(bat.get("charg_flag")):
+            low, reason = 0.0, "soc_high"
+        if temp is not None and not cfg.temp_min <= temp <= cfg.temp_max:
+            low, high, reason = 0.0, 0.0, "temperature"
+        return low, high, reason
+
+    def reset(self, output: float = 0.0) -> None:
+        self.output = output
+        self._error = None
+        self._last = None
+
+    def update(self, grid: float, now: float, bat: Any = None) -> int:
+        """Fold one grid reading (W, positive = import) taken at ``now`` into the setpoint."""
+        cfg = self.cfg
+        dt = min(now - self._last, cfg.max_dt) if self._last is not None else 0.0
+        self._last = now
+
+        error = grid - cfg.target
+        output = self.output
+        if abs(error) <= cfg.deadband:
+            # Re-enter from the band without a proportional kick.
+            self._error = None
+        else:
+            previous = self._error if self._error is not None else error
+            self._error = error
+            step = cfg.kp * (error - previous) + cfg.ki * dt * error
+            max_step = cfg.slew_rate * dt
+            output += min(max(step, -max_step), max_step)
+
+        low, high, reason = self.limits(bat)
+        self.output = min(max(output, low), high)
+        self.limited = reason if self.output != output else None
+        return round(self.output)
+
+
+def grid_power(state: State | None) -> float | None:
+    """Grid power in W from a sensor state, None if unusable."""
+    if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+        return None
+    try:
+        value = float(state.state)
+    except ValueError:
+        return None
+    if state.attributes.get("unit_of_measurement") == UnitOfPower.KILO_WATT:
+        value *= 1000
+    return value
+
+
+class ZeroExportController:
+    """Holds grid power at the target by steering the passive setpoint.
+
+    Runs on every state change of the grid sensor (no polling of its own);
+    setpoints go through the coordinator's write queue, which sends them
+    ahead of queued polls and coalesces those that arrive faster than the
+    link allows.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: MarstekVenusCoordinator,
+        entity_id: str,
+        cfg: ControllerConfig,
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entity_id = entity_id
+        self.pi = PiController(cfg)
+        self.grid: float | None = None
+        self._unsubs: list[Callable[[], None]] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @callback
+    def async_start(self) -> None:
+        """Subscribe to the grid sensor; call before the coordinator prunes its polls."""
+        # The SOC/temperature guards read the bat snapshot.
+        self._unsubs.append(self.coordinator.async_add_consumer("Bat.GetStatus"))
+        self._unsubs.append(
+            async_track_state_change_event(self.hass, [self.entity_id], self._async_grid_changed)
+        )
+        # A meter that stops changing sends no events; keep the countdown from running out.
+        # The scheduler drops repeats within half a countdown; ticking every third of
+        # one, a refresh goes out at most 5/6 of a countdown after the last confirm.
+        self._unsubs.append(
+            async_track_time_interval(
+                self.hass, self._async_keepalive, timedelta(seconds=self.pi.cfg.cd_time / 3)
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        while self._unsubs:
+            self._unsubs.pop()()
+        for task in self._tasks:
+            task.cancel()
+
+    @callback
+    def _async_grid_changed(self, event: Event) -> None:
+        grid = grid_power(event.data.get("new_state"))
+        if grid is None:
+            return
+        self.grid = grid
+        self._async_send(self.pi.update(grid, time.monotonic(), self.coordinator.data.get("bat")))
+
+    @callback
+    def _async_keepalive(self, now: datetime) -> None:
+        if self.grid is not None:
+            self._async_send(round(self.pi.output))
+
+    @callback
+    def _async_send(self, setpoint: int) -> None:
+        # Unchanged setpoints are passed on too: the scheduler drops them
+        # until half the countdown is over, then refreshes the device's.
+        task = self.coordinator.entry.async_create_background_task(
+            self.hass, self._async_apply(setpoint), name=f"zero export {self.entity_id}"
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _async_apply(self, setpoint: int) -> None:
+        if not await self.coordinator.async_set_passive_power(setpoint, self.pi.cfg.cd_time):
+            _LOGGER.debug("Setpoint %s W not confirmed by %s", setpoint, self.coordinator.host)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "grid_sensor": self.entity_id,
+            "grid": self.grid,
+            "output": round(self.pi.output),
+            "limited": self.pi.limited,
+        }
@@ -1,34 +1,50 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import heapq
+import ipaddress
 import logging
-import socket
-from dataclasses import dataclass
-from datetime import timedelta
-from typing import Any
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_HOST, CONF_MAC, CONF_PORT
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
-    CONF_LOOP_INTERVAL,
-    CONF_ES_STATUS_INTERVAL,
-    CONF_BAT_STATUS_INTERVAL,
-    CONF_ES_MODE_INTERVAL,
+    CONF_HOLD_LAST_VALUE,
     CONF_MIN_REQUEST_GAP,
     CONF_UDP_TIMEOUT,
-    DEFAULT_LOOP_INTERVAL,
-    DEFAULT_ES_STATUS_INTERVAL,
-    DEFAULT_BAT_STATUS_INTERVAL,
-    DEFAULT_ES_MODE_INTERVAL,
+    DEFAULT_HOLD_LAST_VALUE,
     DEFAULT_MIN_REQUEST_GAP,
     DEFAULT_UDP_TIMEOUT,
 )
+from .aggregates import AGGREGATE_KEYS, Aggregates
+from .capabilities import (
+    VenusCapabilityCache,
+    async_get_capability_cache,
+    device_identity,
+    firmware_identity,
+)
+from .discovery import async_get_discovery_cache, async_rediscover, device_mac
+from .energy import EnergyIntegrator
+from .methods import METHODS_BY_KEY, METHODS_BY_NAME, POLL_METHODS, VenusPollMethod
+from .schedule import MANUAL_SLOTS, changed_slots, full_schedule
+from .snapshot import SNAPSHOT_KEYS, VenusSnapshotStore
+from .stats import SchedulerStats
+from .timeseries import TimeSeries
+from .status import VenusStatus, as_plain
+from .trace import RequestTrace
+from .transport import FleetDeviceTransport, RttEstimator, VenusFleetTransport, VenusUdpTransport
+
+if TYPE_CHECKING:
+    from .controller import ZeroExportController
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,11 +56,47 @@ def dig(data: dict[str, Any], path: str) -> Any:
             return None
         if isinstance(cur, dict) and part in cur:
             cur = cur[part]
+        elif isinstance(cur, VenusStatus):
+            cur = cur.get(part)
         else:
             return None
     return cur
 
 
+def compile_path(path: str) -> Callable[[dict[str, Any]], Any]:
+    """Reader for a dotted data path, equivalent to ``dig(data, path)``.
+
+    The path is split once. A field of a decoded status snapshot becomes a
+    plain attribute read.
+    """
+    key, *parts = path.split(".")
+    if not parts:
+        return lambda data: data.get(key)
+    if len(parts) > 1:
+        return lambda data: dig(data, path)
+
+    name = parts[0]
+    poll = METHODS_BY_KEY.get(key)
+    if poll is not None and poll.status is not None and name in poll.status.FIELDS:
+        status_cls = poll.status
+
+        def read_status_field(data: dict[str, Any]) -> Any:
+            section = data.get(key)
+            if type(section) is status_cls:
+                return getattr(section, name)
+            return dig(data, path)
+
+        return read_status_field
+
+    def read_field(data: dict[str, Any]) -> Any:
+        section = data.get(key)
+        if isinstance(section, dict):
+            return section.get(name)
+        return dig(data, path)
+
+    return read_field
+
+
 def _is_trueish(v: Any) -> bool:
     """Accept only real truthy values from the API."""
     if v is True:
@@ -58,129 +110,545 @@ def _is_trueish(v: Any) -> bool:
     return False
 
 
-class _UdpClient:
-    """Blocking UDP client (socket reused), executed in executor thread."""
+async def async_test_udp_connection(hass: HomeAssistant, host: str, port: int, timeout: float) -> bool:
+    """Quick connectivity check used by config flow."""
+    client = VenusUdpTransport(host, port, timeout)
+    try:
+        r = await client.async_call("ES.GetStatus", {"id": 0})
+        return isinstance(r, dict) and ("result" in r or "error" in r)
+    except Exception:
+        return False
+    finally:
+        client.close()
 
-    def __init__(self, host: str, port: int, timeout: float) -> None:
-        self._host = host
-        self._port = port
-        self._timeout = float(timeout)
-        self._sock: socket.socket | None = None
 
-    def close(self) -> None:
-        if self._sock is not None:
-            try:
-                self._sock.close()
-            finally:
-                self._sock = None
-
-    def _ensure_socket(self) -> socket.socket:
-        if self._sock is None:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.settimeout(self._timeout)
-            s.connect((self._host, self._port))
-            self._sock = s
-        return self._sock
-
-    def call(self, payload: dict[str, Any]) -> dict[str, Any]:
-        s = self._ensure_socket()
-        try:
-            data = json.dumps(payload).encode("utf-8")
-            s.send(data)
-            resp = s.recv(65535)
-            return json.loads(resp.decode("utf-8"))
-        except Exception:
-            self.close()
-            raise
+DATA_FLEET = f"{DOMAIN}_fleet"
 
+# Pseudo-method consumed by the diagnostic stats sensors.
+STATS_FEED = "stats"
 
-async def async_test_udp_connection(hass: HomeAssistant, host: str, port: int, timeout: float) -> bool:
-    """Quick connectivity check used by config flow."""
-    def _test() -> bool:
-        client = _UdpClient(host, port, timeout)
-        try:
-            r = client.call({"id": 1, "method": "ES.GetStatus", "params": {"id": 0}})
-            return isinstance(r, dict) and ("result" in r or "error" in r)
-        except Exception:
-            return False
-        finally:
-            client.close()
 
-    return await hass.async_add_executor_job(_test)
+@callback
+def async_get_fleet(hass: HomeAssistant) -> VenusFleetTransport:
+    """Shared UDP endpoint for every configured Venus unit."""
+    fleet: VenusFleetTransport | None = hass.data.get(DATA_FLEET)
+    if fleet is None:
+        fleet = hass.data[DATA_FLEET] = VenusFleetTransport()
+    return fleet
 
 
 @dataclass
 class SchedulerConfig:
-    loop_interval: int
-    es_status_interval: int
-    bat_status_interval: int
-    es_mode_interval: int
-    min_request_gap: int
+    # method name -> poll interval (seconds)
+    intervals: dict[str, int]
+    min_request_gap: float
     udp_timeout: float
 
 
-class VenusScheduler:
-    """Loop; per tick at most ONE UDP request."""
+@dataclass
+class _Write:
+    """A queued command; callers whose command it replaced share its outcome."""
+
+    key: str
+    method: str
+    params: dict[str, Any]
+    # Checked against the decoded result of ``verify_method``; None skips verification.
+    verify: Callable[[Any], bool] | None
+    verify_method: str
+    requested: Any
+    waiters: list[asyncio.Future[bool]] = field(default_factory=list)
+    # Set once the command was accepted and is being read back.
+    written: float | None = None
+    attempt: int = 0
+    delay: float = 0.0
+    due: float = 0.0
+
+
+# Adaptive timeout: lower bound and retries per request (each retry doubles the timeout).
+_MIN_RTO = 0.3
+_MAX_RETRIES = 2
+
+# JSON-RPC error code of a method the firmware does not implement.
+_METHOD_NOT_FOUND = -32601
+
+# Circuit breaker: after this many failed requests in a row polling backs off and only
+# a single cheap probe is sent per backoff period (doubling up to the maximum).
+_BREAKER_THRESHOLD = 3
+_BREAKER_MIN_BACKOFF = 10.0
+_BREAKER_MAX_BACKOFF = 300.0
+
+# Writes are checked by reading back the state: the first read goes out after an
+# adaptive delay (learnt from how long the device took last time), then backs off
+# by doubling.
+_VERIFY_MIN_DELAY = 0.25
+_VERIFY_MAX_DELAY = 4.0
+_VERIFY_ATTEMPTS = 5
+
+# Once the breaker is open, look for the unit (by MAC) at a new address; the pause
+# between searches doubles up to the maximum while it stays unreachable.
+_REDISCOVERY_MIN_BACKOFF = 120.0
+_REDISCOVERY_MAX_BACKOFF = 3600.0
+
+# Top-level data key -> change-tracking section. Keys not listed never change.
+_SECTION_OF_KEY: dict[str, str] = {
+    "last_request": "diag",
+    "last_error": "diag",
+    "stats": "stats",
+    "manual": "manual",
+    "energy": "es",
+}
+for _m in POLL_METHODS:
+    _SECTION_OF_KEY[_m.key] = _m.key
+    _SECTION_OF_KEY[_m.ok_key] = "diag"
+# Rolling aggregates change together with the section they are computed from.
+for _key in AGGREGATE_KEYS:
+    _SECTION_OF_KEY[f"{_key}_agg"] = _key
+
+
+def section_of(path: str) -> str:
+    """Change-tracking section an entity path reads from."""
+    return _SECTION_OF_KEY.get(path.split(".", 1)[0], "static")
+
+
+class ValueCache:
+    """Current and last good value per data path.
+
+    A path is looked up again only after its section changed, and the last
+    non-None value is kept, so entities can choose between holding it and
+    going unknown without a second entity per sensor.
+    """
+
+    def __init__(self, scheduler: VenusScheduler) -> None:
+        self._scheduler = scheduler
+        # path -> [section version, current value, last good value]
+        self._entries: dict[str, list[Any]] = {}
+
+    def get(self, path: str, read: Callable[[dict[str, Any]], Any], section: str, hold: bool) -> Any:
+        """``read`` is the compiled accessor for ``path`` (see compile_path)."""
+        version = self._scheduler.section_version(section)
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != version:
+            value = read(self._scheduler.data)
+            held = value if value is not None else (entry[2] if entry is not None else None)
+            entry = self._entries[path] = [version, value, held]
+        return entry[2] if hold else entry[1]
+
+    def has_value(self, path: str) -> bool:
+        entry = self._entries.get(path)
+        return entry is not None and entry[2] is not None
+
+    def seed(self, path: str, value: Any) -> None:
+        """Last good value from before a restart (e.g. restored entity state)."""
+        entry = self._entries.get(path)
+        if entry is None:
+            self._entries[path] = [-1, None, value]
+        elif entry[2] is None:
+            entry[2] = value
 
-    def __init__(self, hass: HomeAssistant, host: str, port: int, cfg: SchedulerConfig) -> None:
+
+class VenusScheduler:
+    """Deadline-driven poller; at most ONE UDP request in flight.
+
+    Next-due times per method live in a heap. ``async_wait_due`` sleeps until
+    the earliest deadline that ``min_request_gap`` also allows, and ``tick``
+    then sends exactly one request. The clock is injectable so a simulated
+    clock can be replayed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        cfg: SchedulerConfig,
+        clock: Callable[[], float] = time.monotonic,
+        client: VenusUdpTransport | FleetDeviceTransport | None = None,
+    ) -> None:
         self.hass = hass
         self.host = host
         self.port = port
         self.cfg = cfg
+        self._clock = clock
 
         self._lock = asyncio.Lock()
-        self._client = _UdpClient(host, port, cfg.udp_timeout)
+        self._client = client or VenusUdpTransport(host, port, cfg.udp_timeout)
+
+        self.stats = SchedulerStats([m.method for m in POLL_METHODS])
+        self.trace = RequestTrace()
+        # Recent numeric samples, stamped with wall-clock time.
+        self.series = TimeSeries()
+        self.aggregates = Aggregates()
+        self.energy = EnergyIntegrator()
+        self._client.on_mismatch = self.stats.record_mismatch
 
         self._data: dict[str, Any] = {
             "ts": None,
             "host": host,
             "port": port,
             "device_name": "Marstek Venus E 3.0",
-            "bat": None,
-            "es": None,
-            "mode": None,
             # diagnostics
             "last_request": None,
             "last_error": None,
-            "last_es_ok": None,
-            "last_bat_ok": None,
-            "last_mode_ok": None,
+            "stats": None,
         }
+        for m in POLL_METHODS:
+            self._data[m.key] = None
+            self._data[m.ok_key] = None
+
+        # Authoritative next-due time per method; the heap may hold stale entries
+        # which are skipped lazily when they no longer match. Methods absent
+        # from _due are not polled at all.
+        self._due: dict[str, float] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._consumers: dict[str, int] = {}
+        # Methods the firmware answered with an error during the capability probe.
+        self.unsupported: set[str] = set()
+        self.identity: str | None = None
+        self.mac: str | None = None
+        self.firmware: str | None = None
+        self.capabilities_source: str | None = None
+        now = self._now()
+        for m in POLL_METHODS:
+            if m.enabled:
+                self._schedule(m.method, now)
 
-        self._last_es_status: float | None = None
-        self._last_bat_status: float | None = None
-        self._last_es_mode: float | None = None
         self._last_request_ts: float | None = None
 
-    async def async_close(self) -> None:
-        def _close() -> None:
-            self._client.close()
+        # Commands waiting to be sent (by coalescing key, oldest first) and
+        # commands sent and now being read back. Both go ahead of polling.
+        self._writes: dict[str, _Write] = {}
+        self._verifying: dict[str, _Write] = {}
+        self._verify_delay = _VERIFY_MIN_DELAY
+        self._wake = asyncio.Event()
+        self._yield_to_poll = False
+        # Last command confirmed per key, with the time it was confirmed.
+        self._applied: dict[str, tuple[Any, float]] = {}
+
+        # udp_timeout is the ceiling; the actual timeout follows the measured RTT.
+        self.rtt = RttEstimator(cfg.udp_timeout, _MIN_RTO, cfg.udp_timeout)
+        self._failures = 0
+        self._breaker_until: float | None = None
+        self._breaker_backoff = _BREAKER_MIN_BACKOFF
+
+        # Bumped whenever a value in the section changes; ``version`` covers all sections.
+        self._versions: dict[str, int] = dict.fromkeys(("static", *_SECTION_OF_KEY.values()), 0)
+        self.version = 0
+
+    def section_version(self, section: str) -> int:
+        return self._versions.get(section, 0)
+
+    def _set(self, key: str, value: Any) -> None:
+        if self._data.get(key) == value:
+            return
+        self._data[key] = value
+        section = _SECTION_OF_KEY.get(key, "static")
+        self._versions[section] += 1
+        self.version += 1
+
+    @property
+    def data(self) -> dict[str, Any]:
+        return self._data
 
-        await self.hass.async_add_executor_job(_close)
+    @property
+    def mismatched_replies(self) -> int:
+        return self._client.mismatched
+
+    async def async_close(self) -> None:
+        for write in (*self._writes.values(), *self._verifying.values()):
+            self._resolve(write, False)
+        self._writes.clear()
+        self._verifying.clear()
+        self._client.close()
 
     def _now(self) -> float:
-        return dt_util.utcnow().timestamp()
+        return self._clock()
 
     def _iso_now(self) -> str:
         return dt_util.utcnow().isoformat()
 
-    async def _call(self, method: str, params: dict[str, Any] | None, rpc_id: int) -> dict[str, Any]:
-        payload: dict[str, Any] = {"id": rpc_id, "method": method}
-        if params is not None:
-            payload["params"] = params
+    def _schedule(self, method: str, due: float) -> None:
+        self._due[method] = due
+        heapq.heappush(self._heap, (due, METHODS_BY_NAME[method].priority, method))
+
+    def add_consumer(self, method: str) -> Callable[[], None]:
+        """Declare that something reads ``method``'s data; returns a release callback.
+
+        ``STATS_FEED`` is accepted too and turns on publishing the stats summary.
+        """
+        self._consumers[method] = self._consumers.get(method, 0) + 1
+        if method in METHODS_BY_NAME and method not in self._due and method not in self.unsupported:
+            self._schedule(method, self._now())
+
+        def _release() -> None:
+            self._consumers[method] -= 1
+            if not self._consumers[method]:
+                self._due.pop(method, None)
 
-        def _do_call() -> dict[str, Any]:
-            return self._client.call(payload)
+        return _release
 
-        return await self.hass.async_add_executor_job(_do_call)
+    def prune_unconsumed(self) -> None:
+        """Stop polling methods that nothing declared it reads."""
+        for method in list(self._due):
+            if not self._consumers.get(method):
+                del self._due[method]
+
+    def refresh_all(self) -> None:
+        """Make every polled method due now; they then go out back to back, min_request_gap apart."""
+        now = self._now()
+        for method in list(self._due):
+            self._schedule(method, now)
+
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        """Seed data with persisted results; their ``last_*_ok`` stay empty until polled."""
+        self.energy.restore(snapshot.get("energy"))
+        for key, value in snapshot.items():
+            if self._data.get(key) is None:
+                poll = METHODS_BY_KEY.get(key)
+                self._set(key, poll.decode(value) if poll is not None else value)
+
+    def set_unsupported(self, methods: set[str], source: str) -> None:
+        """Skip methods the firmware cannot answer.
+
+        Methods polled by default (ES/Bat status, mode) are never skipped.
+        """
+        self.unsupported = {m for m in methods if not (m in METHODS_BY_NAME and METHODS_BY_NAME[m].enabled)}
+        self.capabilities_source = source
+        for method in self.unsupported:
+            self._due.pop(method, None)
+
+    def _store_result(self, poll: VenusPollMethod, result: Any, now: float) -> None:
+        status = poll.decode(result)
+        self._set(poll.key, status)
+        self.series.record(poll.key, status, time.monotonic())
+        if (aggregates := self.aggregates.record(poll.key, status, now)) is not None:
+            self._set(f"{poll.key}_agg", aggregates)
+        if (energy := self.energy.record(poll.key, status, now)) is not None:
+            self._set("energy", energy)
+        self._set(poll.ok_key, self._iso_now())
+        self._set("last_error", None)
+        if poll.method in self._due:
+            self._schedule(poll.method, now + self.cfg.intervals[poll.method])
+
+    async def async_probe_capabilities(self, cache: VenusCapabilityCache) -> None:
+        """Find out which registered methods this firmware answers.
+
+        Marstek.GetDevice identifies the device/firmware; a cached result for
+        that unit, or any unit of the same model and firmware, is reused.
+        Otherwise every method is called once: a result means supported, a
+        "method not found" error means unsupported, and silence or any other
+        error leaves it undecided (and the outcome uncached). Successful
+        replies are kept as data, so the probe doubles as a warm-up.
+        """
+        device = METHODS_BY_NAME["Marstek.GetDevice"]
+        answers: dict[str, bool | None] = {}
+
+        async with self._locked():
+            answers[device.method] = await self._probe(device)
+            if self.identity is not None:
+                cached = await cache.async_get(self.identity, self.firmware)
+                if cached is not None:
+                    self.set_unsupported(cached, "cache")
+                    return
+
+            for poll in POLL_METHODS:
+                if poll is not device:
+                    answers[poll.method] = await self._probe(poll)
+
+        if all(ok is None for ok in answers.values()):
+            # Offline: nothing learned, capabilities_source stays None until a re-probe.
+            return
+        unsupported = {method for method, ok in answers.items() if ok is False}
+        self.set_unsupported(unsupported, "probe")
+        if self.identity is not None and None not in answers.values():
+            await cache.async_set((self.identity, self.firmware), unsupported)
+
+    async def _probe(self, poll: VenusPollMethod) -> bool | None:
+        await self._respect_min_gap()
+        self._set("last_request", poll.method)
+        try:
+            r = await self._call(poll.method, poll.params)
+        except Exception:  # noqa: BLE001 - no answer is an answer too
+            self._last_request_ts = self._now()
+            return None
+        self._last_request_ts = now = self._now()
+
+        if "result" not in r:
+            # Only "method not found" is an answer; other errors may be transient.
+            return False if dig(r, "error.code") == _METHOD_NOT_FOUND else None
+        self._store_result(poll, r["result"], now)
+        if poll.method == "Marstek.GetDevice":
+            self.identity = device_identity(r["result"])
+            self.mac = device_mac(r["result"])
+            self.firmware = firmware_identity(r["result"])
+        return True
+
+    def polled_methods(self) -> list[str]:
+        return sorted(self._due, key=lambda method: METHODS_BY_NAME[method].priority)
+
+    def _peek(self) -> tuple[float, str] | None:
+        heap = self._heap
+        while heap:
+            due, _, method = heap[0]
+            if self._due.get(method) == due:
+                return due, method
+            heapq.heappop(heap)
+        return None
+
+    def next_wakeup(self) -> float:
+        """Earliest time at which a request may be sent and one is due.
+
+        Queued writes are due at once and are tried even while the breaker is open.
+        """
+        head = self._peek()
+        due = head[0] if head is not None else self._now() + 60.0
+        for write in self._verifying.values():
+            due = min(due, write.due)
+        if self._writes:
+            due = float("-inf")  # already due
+        if self._last_request_ts is not None:
+            due = max(due, self._last_request_ts + self.cfg.min_request_gap)
+        if self._breaker_until is not None and not self._writes:
+            due = max(due, self._breaker_until)
+        return due
+
+    @property
+    def breaker_open(self) -> bool:
+        return self._breaker_until is not None
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self._failures
+
+    def reliability_state(self) -> dict[str, Any]:
+        return {
+            **self.rtt.as_dict(),
+            "consecutive_failures": self._failures,
+            "breaker": "open" if self.breaker_open else "closed",
+            "breaker_backoff": self._breaker_backoff if self.breaker_open else None,
+        }
+
+    def _record_reachable(self) -> None:
+        was_open = self.breaker_open
+        self._failures = 0
+        self._breaker_until = None
+        self._breaker_backoff = _BREAKER_MIN_BACKOFF
+        if was_open:
+            # Everything went stale while the device was away; refresh all of it.
+            self.refresh_all()
+
+    def _record_unreachable(self) -> None:
+        self._failures += 1
+        if self._failures < _BREAKER_THRESHOLD:
+            return
+        if self.breaker_open:
+            self._breaker_backoff = min(self._breaker_backoff * 2, _BREAKER_MAX_BACKOFF)
+        self._breaker_until = self._now() + self._breaker_backoff
+
+    async def async_rebind(self, host: str, client: VenusUdpTransport | FleetDeviceTransport) -> None:
+        """Talk to the unit at a new address; refreshes everything right away."""
+        async with self._locked():
+            self._client.close()
+            self._client = client
+            self._client.on_mismatch = self.stats.record_mismatch
+            self.host = host
+            self._set("host", host)
+            self.rtt = RttEstimator(self.cfg.udp_timeout, _MIN_RTO, self.cfg.udp_timeout)
+            self._failures = 0
+            self._breaker_until = None
+            self._breaker_backoff = _BREAKER_MIN_BACKOFF
+            self.refresh_all()
+
+    async def async_wait_due(self) -> None:
+        """Sleep until ``next_wakeup``, or until a write is queued."""
+        self._wake.clear()
+        delay = self.next_wakeup() - self._now()
+        if delay > 0:
+            try:
+                async with asyncio.timeout(delay):
+                    await self._wake.wait()
+            except TimeoutError:
+                pass
+
+    @asynccontextmanager
+    async def _locked(self) -> AsyncIterator[None]:
+        waited = self._now()
+        async with self._lock:
+            self.stats.lock_wait.add(self._now() - waited)
+            yield
+
+    async def _call(self, method: str, params: dict[str, Any] | None) -> dict[str, Any]:
+        """Send with an RTT-derived timeout and bounded retries.
+
+        While the breaker is open only a single attempt is made, which is the
+        cheap probe that tells us whether the device is back.
+        """
+        stats = self.stats.method(method)
+        attempts = 1 if self.breaker_open else 1 + _MAX_RETRIES
+        for attempt in range(attempts):
+            if attempt:
+                await self._respect_min_gap()
+            self._last_request_ts = self._now()
+            sent = time.time()
+            stats.sent += 1
+            try:
+                r = await self._client.async_call(method, params, timeout=self.rtt.rto)
+            except TimeoutError:
+                stats.timeout += 1
+                self.trace.record(method, self._client.last_id, sent, None, "timeout", params)
+                self.rtt.backoff()
+                continue
+            except Exception as err:
+                stats.error += 1
+                self.trace.record(method, self._client.last_id, sent, None, "exception", repr(err))
+                self._record_unreachable()
+                raise
+            rtt = self._client.last_rtt
+            if "result" in r:
+                stats.ok += 1
+                self.trace.record(method, self._client.last_id, sent, rtt, "ok", r)
+            else:
+                stats.error += 1
+                self.trace.record(method, self._client.last_id, sent, rtt, "error", r)
+            if rtt is not None:
+                stats.add_rtt(rtt)
+                self.rtt.sample(rtt)
+            self._record_reachable()
+            return r
+
+        self._record_unreachable()
+        raise TimeoutError(f"{method}: no reply after {attempts} attempt(s)")
 
     async def _respect_min_gap(self) -> None:
         now = self._now()
         if self._last_request_ts is None:
             return
-        gap = float(self.cfg.min_request_gap) - (now - self._last_request_ts)
+        gap = self.cfg.min_request_gap - (now - self._last_request_ts)
         if gap > 0:
             await asyncio.sleep(gap)
+            self.stats.gap_wait.add(gap)
+
+    @staticmethod
+    def _mode_config(mode: str) -> dict[str, Any] | None:
+        # Payloads follow Open API examples (Auto/AI/Manual). :contentReference[oaicite:2]{index=2}
+        if mode == "Auto":
+            return {"mode": "Auto", "auto_cfg": {"enable": 1}}
+        if mode == "AI":
+            return {"mode": "AI", "ai_cfg": {"enable": 1}}
+        if mode == "Manual":
+            # Minimal "do nothing" slot: power 0, enabled, 1 minute window.
+            # Many firmwares reject ES.SetMode Manual without manual_cfg. :contentReference[oaicite:3]{index=3}
+            return {
+                "mode": "Manual",
+                "manual_cfg": {
+                    "time_num": 9,
+                    "start_time": "00:00",
+                    "end_time": "00:01",
+                    "week_set": 127,
+                    "power": 0,
+                    "enable": 1,
+                },
+            }
+        return None
 
     async def async_set_mode(self, mode: str) -> bool:
         """
@@ -188,177 +656,481 @@ class VenusScheduler:
         We do NOT fake-update the mode sensor anymore.
         ES.SetMode response contains result.set_result boolean per API docs. :contentReference[oaicite:1]{index=1}
         """
-        async with self._lock:
-            await self._respect_min_gap()
-
-            now = self._now()
-            self._data["ts"] = self._iso_now()
-            self._data["last_request"] = "ES.SetMode"
-
-            # Payloads follow Open API examples (Auto/AI/Manual). :contentReference[oaicite:2]{index=2}
-            if mode == "Auto":
-                cfg = {"mode": "Auto", "auto_cfg": {"enable": 1}}
-            elif mode == "AI":
-                cfg = {"mode": "AI", "ai_cfg": {"enable": 1}}
-            elif mode == "Manual":
-                # Minimal "do nothing" slot: power 0, enabled, 1 minute window.
-                # Many firmwares reject ES.SetMode Manual without manual_cfg. :contentReference[oaicite:3]{index=3}
-                cfg = {
-                    "mode": "Manual",
-                    "manual_cfg": {
-                        "time_num": 9,
-                        "start_time": "00:00",
-                        "end_time": "00:01",
-                        "week_set": 127,
-                        "power": 0,
-                        "enable": 1,
-                    },
-                }
-            else:
-                self._data["last_error"] = f"Unsupported mode: {mode}"
-                return False
+        cfg = self._mode_config(mode)
+        if cfg is None:
+            self._set("last_error", f"Unsupported mode: {mode}")
+            return False
+        # Some firmwares are picky; harmless to include config.id as well.
+        params = {"id": 0, "config": {"id": 0, **cfg}}
+        ok = await self.async_write(
+            "mode", "ES.SetMode", params, requested=mode, verify=lambda status: status.get("mode") == mode
+        )
+        if "manual_cfg" in cfg:
+            # Only if this very command was applied, not one that replaced it.
+            applied = self._applied.get("mode")
+            self._remember_manual_slot(cfg["manual_cfg"], ok and applied is not None and applied[0] == mode)
+        return ok
+
+    async def async_set_manual_schedule(self, slots: list[dict[str, Any]]) -> dict[str, list[int]]:
+        """Program the manual-mode week, writing only slots that changed.
+
+        ``slots`` is the full schedule (see schedule.manual_slot); slots it
+        leaves out are disabled. It is compared with data["manual"], the
+        slots the device last confirmed, and each differing slot is queued
+        under its own write key, so the batch goes out one per
+        min_request_gap and one ES.GetMode read can confirm several. A slot
+        whose write failed drops out of the cached copy and is rewritten by
+        the next call. If every slot is in place but the unit runs another
+        mode, one slot is rewritten, which switches it to Manual. Raises
+        ValueError for an invalid schedule.
+        """
+        schedule = full_schedule(slots)
+        changed = changed_slots(self._data.get("manual"), schedule)
+        mode = self._data.get("mode")
+        if not changed and (mode is None or mode.get("mode") != "Manual"):
+            changed = [next((cfg for cfg in schedule.values() if cfg["enable"]), schedule["0"])]
+        results = await asyncio.gather(*(self._async_write_manual_slot(cfg) for cfg in changed))
+        written = [cfg["time_num"] for cfg, ok in zip(changed, results, strict=True) if ok]
+        failed = [cfg["time_num"] for cfg, ok in zip(changed, results, strict=True) if not ok]
+        touched = {cfg["time_num"] for cfg in changed}
+        return {
+            "written": written,
+            "failed": failed,
+            "unchanged": [n for n in range(MANUAL_SLOTS) if n not in touched],
+        }
 
-            try:
-                # Some firmwares are picky; harmless to include config.id as well.
-                params = {"id": 0, "config": {"id": 0, **cfg}}
-                r_set = await self._call("ES.SetMode", params, 20)
-                self._last_request_ts = self._now()
+    async def _async_write_manual_slot(self, cfg: dict[str, Any]) -> bool:
+        params = {"id": 0, "config": {"id": 0, "mode": "Manual", "manual_cfg": cfg}}
+        key = f"manual:{cfg['time_num']}"
+        ok = await self.async_write(
+            key, "ES.SetMode", params, requested=cfg, verify=lambda status: status.get("mode") == "Manual"
+        )
+        # A newer schedule may have replaced this slot's write; cache what was confirmed.
+        applied = self._applied.get(key)
+        self._remember_manual_slot(applied[0] if ok and applied is not None else cfg, ok)
+        return ok
+
+    def _remember_manual_slot(self, cfg: dict[str, Any], ok: bool) -> None:
+        manual = dict(self._data.get("manual") or {})
+        if ok:
+            manual[str(cfg["time_num"])] = cfg
+        else:
+            manual.pop(str(cfg["time_num"]), None)
+        self._set("manual", manual)
 
-                set_result = dig(r_set, "result.set_result")
-                ok = _is_trueish(set_result)
+    async def async_set_passive_power(self, power: int, cd_time: int) -> bool:
+        """Hold ``power`` W (positive discharges, negative charges) for ``cd_time`` seconds.
 
-                if not ok:
-                    self._data["last_error"] = {"ES.SetMode": r_set}
-                    return False
+        Uses ES.SetMode Passive. A setpoint identical to the one the device
+        confirmed within the first half of its countdown is not resent.
+        Faster setpoints coalesce in the write queue, so at most one goes out
+        per min_request_gap; the latest wins and the ones it replaced return False.
+        """
+        requested = {"mode": "Passive", "power": int(power), "cd_time": int(cd_time)}
+        applied = self._applied.get("mode")
+        if (
+            applied is not None
+            and applied[0] == requested
+            and self._now() - applied[1] < cd_time / 2
+            and "mode" not in self._writes
+            and "mode" not in self._verifying
+        ):
+            return True
+        params = {
+            "id": 0,
+            "config": {"id": 0, "mode": "Passive", "passive_cfg": {"power": int(power), "cd_time": int(cd_time)}},
+        }
+        return await self.async_write(
+            "mode", "ES.SetMode", params, requested=requested, verify=lambda status: status.get("mode") == "Passive"
+        )
 
-                # Give the device a tiny moment, then verify via ES.GetMode. :contentReference[oaicite:4]{index=4}
-                await asyncio.sleep(0.3)
-                await self._respect_min_gap()
+    @property
+    def passive_setpoint(self) -> int | None:
+        """Power of the last confirmed passive setpoint, None outside passive mode.
 
-                self._data["last_request"] = "ES.GetMode"
-                r_mode = await self._call("ES.GetMode", {"id": 0}, 21)
-                self._last_request_ts = self._now()
+        None as well once the polled mode is no longer Passive (another mode or
+        a manual slot was written) or the setpoint's countdown has run out.
+        """
+        applied = self._applied.get("mode")
+        mode = self._data.get("mode")
+        if applied is None or not isinstance(applied[0], dict) or mode is None or mode.get("mode") != "Passive":
+            return None
+        requested, confirmed = applied
+        if self._now() - confirmed >= requested["cd_time"]:
+            return None
+        return requested["power"]
+
+    async def async_write(
+        self,
+        key: str,
+        method: str,
+        params: dict[str, Any],
+        *,
+        requested: Any,
+        verify: Callable[[Any], bool] | None = None,
+        verify_method: str = "ES.GetMode",
+    ) -> bool:
+        """Queue a command ahead of polling and wait until it is applied.
+
+        A command still queued or being read back under the same ``key`` is
+        replaced (the last one wins). Its callers share this one's outcome if
+        they asked for the same thing (equal ``requested``); otherwise they
+        get False, since their command was never applied. The result is True
+        once the device accepted the command and, with
+        ``verify``, a read of ``verify_method`` satisfied it. Needs the tick
+        loop running; nothing holds the lock while waiting.
+        """
+        fut: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        write = _Write(key, method, params, verify, verify_method, requested, [fut])
+        for superseded in (self._writes.pop(key, None), self._verifying.pop(key, None)):
+            if superseded is not None:
+                self._supersede(superseded, write)
+        self._writes[key] = write
+        self._wake.set()
+        try:
+            # Bounded, so callers get False rather than hang if the tick loop died.
+            return await asyncio.wait_for(fut, self._write_budget())
+        except TimeoutError:
+            _LOGGER.warning("%s to %s not settled in time", method, self.host)
+            if self._writes.get(key) is write and all(f.done() for f in write.waiters):
+                del self._writes[key]  # nobody waits for it any more
+            return False
 
-                if "result" not in r_mode:
-                    self._data["last_error"] = {"ES.GetMode_after_set": r_mode}
-                    return False
+    def _write_budget(self) -> float:
+        """Seconds a write may take: queued behind a request, sent, then read back."""
+        request = (1 + _MAX_RETRIES) * (self.cfg.udp_timeout + self.cfg.min_request_gap)
+        return request * (2 + _VERIFY_ATTEMPTS) + _VERIFY_ATTEMPTS * _VERIFY_MAX_DELAY
+
+    @staticmethod
+    def _resolve(write: _Write, ok: bool) -> None:
+        for fut in write.waiters:
+            if not fut.done():
+                fut.set_result(ok)
+
+    def _supersede(self, write: _Write, newer: _Write) -> None:
+        """``newer`` replaces ``write``; only callers of the same command wait for it."""
+        if write.requested == newer.requested:
+            newer.waiters[:0] = write.waiters
+        else:
+            self._resolve(write, False)
 
-                actual_mode = dig(r_mode, "result.mode")
-                self._data["mode"] = r_mode["result"]
-                self._data["last_mode_ok"] = self._iso_now()
+    def _hand_over_or_resolve(self, write: _Write, ok: bool) -> None:
+        newer = self._writes.get(write.key)
+        if newer is not None:
+            self._supersede(write, newer)
+        else:
+            self._resolve(write, ok)
 
-                if actual_mode != mode:
-                    self._data["last_error"] = {
-                        "mode_mismatch": {"requested": mode, "actual": actual_mode, "set_response": r_set}
-                    }
-                    return False
+    async def _send_write(self, write: _Write) -> None:
+        """Send one queued command; on success schedule its read-back."""
+        self._set("last_request", write.method)
+        try:
+            r = await self._call(write.method, write.params)
+        except Exception as e:
+            self._last_request_ts = self._now()
+            self._set("last_error", str(e))
+            self._hand_over_or_resolve(write, False)
+            return
+        self._last_request_ts = now = self._now()
 
-                self._data["last_error"] = None
-                # Force next periodic mode poll to refresh again later
-                self._last_es_mode = None
-                return True
+        newer = self._writes.get(write.key)
+        if newer is not None:
+            # Replaced while in flight: the newer command decides.
+            self._supersede(write, newer)
+            return
+        if not _is_trueish(dig(r, "result.set_result")):
+            self._set("last_error", {write.method: r})
+            self._resolve(write, False)
+            return
+        if write.verify is None:
+            self._set("last_error", None)
+            self._applied[write.key] = (write.requested, now)
+            self._resolve(write, True)
+            return
 
-            except Exception as e:
-                self._last_request_ts = self._now()
-                self._data["last_error"] = str(e)
-                return False
+        write.written = now
+        write.attempt = 1
+        write.delay = self._verify_delay
+        write.due = now + write.delay
+        self._verifying[write.key] = write
+
+    def _confirm(self, write: _Write, now: float) -> None:
+        # Start the next read-back at about the time this device needed.
+        needed = (now - write.written) * 0.75 if write.written is not None else 0.0
+        self._verify_delay = min(max(needed, _VERIFY_MIN_DELAY), _VERIFY_MAX_DELAY)
+        del self._verifying[write.key]
+        self._applied[write.key] = (write.requested, now)
+        self._resolve(write, True)
+
+    async def _send_verify(self, write: _Write) -> None:
+        """Read back a written command; retries with doubling delays."""
+        poll = METHODS_BY_NAME[write.verify_method]
+        self._set("last_request", poll.method)
+        sent = self._now()
+        try:
+            r = await self._call(poll.method, poll.params)
+        except Exception as e:  # noqa: BLE001 - retried below
+            self._last_request_ts = now = self._now()
+            r = {"error": str(e)}
+        else:
+            self._last_request_ts = now = self._now()
+
+        if "result" in r:
+            self._store_result(poll, r["result"], now)
+            # The read confirms every command of this kind written before it went out.
+            status = self._data[poll.key]
+            for other in list(self._verifying.values()):
+                if (
+                    other.verify_method == poll.method
+                    and other.written is not None
+                    and other.written <= sent
+                    and other.verify(status)
+                ):
+                    self._confirm(other, now)
+        if self._verifying.get(write.key) is not write:
+            return  # confirmed above, or replaced meanwhile
+
+        if write.attempt >= _VERIFY_ATTEMPTS:
+            del self._verifying[write.key]
+            actual = as_plain(self._data.get(poll.key)) if "result" in r else r
+            self._set(
+                "last_error",
+                {f"{write.key}_mismatch": {"requested": write.requested, "actual": actual}},
+            )
+            self._resolve(write, False)
+            return
+        write.attempt += 1
+        write.delay = min(write.delay * 2, _VERIFY_MAX_DELAY)
+        write.due = now + write.delay
 
     async def tick(self) -> dict[str, Any]:
-        async with self._lock:
+        """Send at most one request: a queued write, a due read-back, or a due poll.
+
+        Writes go first, except that a due poll is served between two writes.
+        """
+        async with self._locked():
             now = self._now()
             self._data["ts"] = self._iso_now()
 
-            if self._last_request_ts is not None and (now - self._last_request_ts) < int(self.cfg.min_request_gap):
-                return self._data
-
-            due_es = self._last_es_status is None or (now - self._last_es_status) >= int(self.cfg.es_status_interval)
-            due_bat = self._last_bat_status is None or (now - self._last_bat_status) >= int(self.cfg.bat_status_interval)
-            due_mode = self._last_es_mode is None or (now - self._last_es_mode) >= int(self.cfg.es_mode_interval)
-
-            if not (due_es or due_bat or due_mode):
+            if now < self.next_wakeup():
                 return self._data
 
-            try:
-                if due_es:
-                    self._data["last_request"] = "ES.GetStatus"
-                    r = await self._call("ES.GetStatus", {"id": 0}, 12)
-                    self._last_request_ts = now
-
-                    if "result" in r:
-                        self._data["es"] = r["result"]
-                        self._last_es_status = now
-                        self._data["last_es_ok"] = self._iso_now()
-                        self._data["last_error"] = None
-                    else:
-                        self._data["last_error"] = {"ES.GetStatus": r.get("error", r)}
-
-                elif due_bat:
-                    self._data["last_request"] = "Bat.GetStatus"
-                    r = await self._call("Bat.GetStatus", {"id": 0}, 11)
-                    self._last_request_ts = now
-
-                    if "result" in r:
-                        self._data["bat"] = r["result"]
-                        self._last_bat_status = now
-                        self._data["last_bat_ok"] = self._iso_now()
-                        self._data["last_error"] = None
-                    else:
-                        self._data["last_error"] = {"Bat.GetStatus": r.get("error", r)}
-
-                else:
-                    self._data["last_request"] = "ES.GetMode"
-                    r = await self._call("ES.GetMode", {"id": 0}, 13)
-                    self._last_request_ts = now
-
-                    if "result" in r:
-                        self._data["mode"] = r["result"]
-                        self._last_es_mode = now
-                        self._data["last_mode_ok"] = self._iso_now()
-                        self._data["last_error"] = None
-                    else:
-                        self._data["last_error"] = {"ES.GetMode": r.get("error", r)}
-
-            except Exception as e:
-                self._last_request_ts = now
-                self._data["last_error"] = str(e)
-
+            head = self._peek()
+            poll_due = head is not None and head[0] <= now
+            if self._breaker_until is not None and now < self._breaker_until:
+                # Open breaker: only writes go out until the backoff expires;
+                # the next due poll after that is the probe.
+                poll_due = False
+            if self._yield_to_poll and poll_due and not self.breaker_open:
+                # A steady stream of setpoints must not starve polling (the
+                # controller's guards read bat): one due poll after each write.
+                self._yield_to_poll = False
+                await self._poll(METHODS_BY_NAME[head[1]], now)
+            elif self._writes:
+                key = next(iter(self._writes))
+                await self._send_write(self._writes.pop(key))
+                self._yield_to_poll = True
+            elif (verify := min(self._verifying.values(), key=lambda w: w.due, default=None)) is not None and verify.due <= now:
+                await self._send_verify(verify)
+            elif poll_due:
+                self._yield_to_poll = False
+                await self._poll(METHODS_BY_NAME[head[1]], now)
+
+            if self._consumers.get(STATS_FEED):
+                self._set("stats", self.stats.summary())
             return self._data
 
+    async def _poll(self, poll: VenusPollMethod, now: float) -> None:
+        method = poll.method
+        self._set("last_request", method)
+        try:
+            r = await self._call(method, poll.params)
+        except Exception as e:
+            self._last_request_ts = self._now()
+            self._set("last_error", str(e))
+            # Stay due; other overdue methods still win by their older deadline.
+            self._schedule(method, now)
+        else:
+            self._last_request_ts = self._now()
+            if "result" in r:
+                self._store_result(poll, r["result"], now)
+            else:
+                self._set("last_error", {method: r.get("error", r)})
+                self._schedule(method, now)
+
 
 class MarstekVenusCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         self.entry = entry
         self.host = entry.data[CONF_HOST]
         self.port = entry.data[CONF_PORT]
+        # Entity/device identity: unlike host it survives re-binding to a new address.
+        self.device_identifier = entry.unique_id or f"{self.host}:{self.port}"
+        self.mac: str | None = entry.data.get(CONF_MAC)
+        # Options this instance was built from; data-only entry updates do not reload.
+        self.options = dict(entry.options)
+        self._next_rediscovery = 0.0
+        self._rediscovery_backoff = _REDISCOVERY_MIN_BACKOFF
+        self._snapshot = VenusSnapshotStore(hass, entry.entry_id)
+        self._snapshot_versions: tuple[int, ...] = ()
 
         opts = entry.options
         cfg = SchedulerConfig(
-            loop_interval=int(opts.get(CONF_LOOP_INTERVAL, DEFAULT_LOOP_INTERVAL)),
-            es_status_interval=int(opts.get(CONF_ES_STATUS_INTERVAL, DEFAULT_ES_STATUS_INTERVAL)),
-            bat_status_interval=int(opts.get(CONF_BAT_STATUS_INTERVAL, DEFAULT_BAT_STATUS_INTERVAL)),
-            es_mode_interval=int(opts.get(CONF_ES_MODE_INTERVAL, DEFAULT_ES_MODE_INTERVAL)),
-            min_request_gap=int(opts.get(CONF_MIN_REQUEST_GAP, DEFAULT_MIN_REQUEST_GAP)),
+            intervals={m.method: int(opts.get(m.interval_option, m.default_interval)) for m in POLL_METHODS},
+            min_request_gap=float(opts.get(CONF_MIN_REQUEST_GAP, DEFAULT_MIN_REQUEST_GAP)),
             udp_timeout=float(opts.get(CONF_UDP_TIMEOUT, DEFAULT_UDP_TIMEOUT)),
         )
 
-        self.scheduler = VenusScheduler(hass, self.host, self.port, cfg)
+        # All entries share one UDP endpoint (see async_get_fleet).
+        client = async_get_fleet(hass).device(self.host, self.port, cfg.udp_timeout)
+        self.scheduler = VenusScheduler(hass, self.host, self.port, cfg, client=client)
+        self.values = ValueCache(self.scheduler)
+        self.hold_last_value = bool(opts.get(CONF_HOLD_LAST_VALUE, DEFAULT_HOLD_LAST_VALUE))
+        # Set up by async_setup_entry when a grid sensor is configured.
+        self.controller: ZeroExportController | None = None
 
+        # No fixed update_interval: the scheduler decides when to wake up and
+        # results are pushed via async_set_updated_data from _async_run.
         super().__init__(
             hass=hass,
             logger=_LOGGER,
             name=f"{DOMAIN} {self.host}",
-            update_interval=timedelta(seconds=cfg.loop_interval),
             update_method=self._async_update,
         )
 
+    async def async_restore_snapshot(self) -> None:
+        """Load the last known es/bat/mode data; call before the first refresh."""
+        self.scheduler.restore(await self._snapshot.async_load())
+        self._snapshot_versions = self._snapshot_state()
+
+    def _snapshot_state(self) -> tuple[int, ...]:
+        return tuple(self.scheduler.section_version(key) for key in SNAPSHOT_KEYS)
+
+    def _async_save_snapshot(self) -> None:
+        state = self._snapshot_state()
+        if state != self._snapshot_versions:
+            self._snapshot_versions = state
+            self._snapshot.async_schedule_save(self.scheduler.data)
+
     async def _async_update(self) -> dict[str, Any]:
         try:
             return await self.scheduler.tick()
         except Exception as err:
             raise UpdateFailed(str(err)) from err
 
+    @callback
+    def async_add_consumer(self, method: str) -> Callable[[], None]:
+        return self.scheduler.add_consumer(method)
+
+    @callback
+    def async_start(self) -> None:
+        """Start the deadline-driven polling loop (cancelled on entry unload).
+
+        Called once the platforms are set up, so every enabled entity has
+        declared the methods it reads and the rest can be dropped. Entities
+        start from the restored snapshot; every polled method is still due
+        from construction, so the loop warms up by fetching them back to
+        back, spaced only by min_request_gap.
+        """
+        self.scheduler.prune_unconsumed()
+        self.entry.async_create_background_task(
+            self.hass, self._async_run(), name=f"{DOMAIN} scheduler {self.host}"
+        )
+
+    async def _async_probe(self) -> None:
+        await self.scheduler.async_probe_capabilities(async_get_capability_cache(self.hass))
+        if self.scheduler.version:
+            self.async_set_updated_data(self.scheduler.data)
+        self._async_save_snapshot()
+        await self._async_remember_address()
+
+    async def _async_run(self) -> None:
+        try:
+            await self._async_probe()
+        except Exception as err:  # noqa: BLE001 - probed again once the unit answers
+            _LOGGER.debug("Capability probe of %s failed: %s", self.host, err)
+
+        while True:
+            try:
+                await self._async_step()
+            except Exception as err:  # noqa: BLE001 - keep the loop alive, writes wait on it
+                _LOGGER.debug("Polling %s failed: %s", self.host, err)
+                self.async_set_update_error(err)
+                await asyncio.sleep(self.scheduler.cfg.min_request_gap)
+
+    async def _async_step(self) -> None:
+        """Wait for the next due request, send it and publish what changed."""
+        await self.scheduler.async_wait_due()
+        version = self.scheduler.version
+        data = await self.scheduler.tick()
+        if self.scheduler.breaker_open:
+            if self.last_update_success:
+                self.async_set_update_error(UpdateFailed("device unreachable"))
+            await self._async_maybe_rediscover()
+            return
+        self._rediscovery_backoff = _REDISCOVERY_MIN_BACKOFF
+        if self.scheduler.capabilities_source is None and not self.scheduler.consecutive_failures:
+            # The unit was offline during the startup probe and just answered.
+            await self._async_probe()
+            return
+        self._async_save_snapshot()
+        # Nothing changed: skip fanning out to every entity.
+        if self.scheduler.version == version and self.last_update_success:
+            return
+        self.async_set_updated_data(data)
+
+    def section_version(self, section: str) -> int:
+        return self.scheduler.section_version(section)
+
+    async def _async_remember_address(self) -> None:
+        """Cache where the unit answered and learn its MAC for later re-binding."""
+        mac = self.scheduler.mac
+        if mac is None:
+            return
+        info = self.scheduler.data.get("device_info") or {}
+        await async_get_discovery_cache(self.hass).async_remember([{**info, "ip": self.host}], self.port)
+        if mac != self.mac:
+            self.mac = mac
+            self.hass.config_entries.async_update_entry(self.entry, data={**self.entry.data, CONF_MAC: mac})
+
+    async def _async_maybe_rediscover(self) -> None:
+        """Follow the unit to a new address after it went silent (e.g. a DHCP change)."""
+        mac = self.scheduler.mac or self.mac
+        now = time.monotonic()
+        if mac is None or now < self._next_rediscovery:
+            return
+        try:
+            ipaddress.ip_address(self.host)
+        except ValueError:
+            return  # configured by hostname; DNS is responsible for moves
+        self._next_rediscovery = now + self._rediscovery_backoff
+        self._rediscovery_backoff = min(self._rediscovery_backoff * 2, _REDISCOVERY_MAX_BACKOFF)
+
+        info = await async_rediscover(self.hass, mac, self.port, self.host)
+        if info is None or info["ip"] == self.host:
+            return
+        await self.async_rebind(info["ip"])
+        await async_get_discovery_cache(self.hass).async_remember([info], self.port)
+
+    async def async_rebind(self, host: str) -> None:
+        """Switch to a new address in place and persist it, without reloading the entry."""
+        _LOGGER.info("Marstek Venus %s moved from %s to %s", self.mac, self.host, host)
+        client = async_get_fleet(self.hass).device(host, self.port, self.scheduler.cfg.udp_timeout)
+        await self.scheduler.async_rebind(host, client)
+        self.host = host
+        self.hass.config_entries.async_update_entry(self.entry, data={**self.entry.data, CONF_HOST: host})
+
     async def async_set_mode(self, mode: str) -> bool:
         return await self.scheduler.async_set_mode(mode)
 
+    async def async_set_manual_schedule(self, slots: list[dict[str, Any]]) -> dict[str, list[int]]:
+        return await self.scheduler.async_set_manual_schedule(slots)
+
+    async def async_set_passive_power(self, power: int, cd_time: int) -> bool:
+        ok = await self.scheduler.async_set_passive_power(power, cd_time)
+        # Setpoint entities show the confirmed value.
+        self.async_update_listeners()
+        return ok
+
     async def async_close(self) -> None:
         await self.scheduler.async_close()
@@ -1,27 +1,51 @@
 from __future__ import annotations
 
+import time
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN
-from .coordinator import MarstekVenusCoordinator
+from .coordinator import MarstekVenusCoordinator, async_get_fleet
+from .status import as_plain
+
+# Diagnostics show the last hour of samples, one row per minute.
+_SERIES_WINDOW = 3600
+_SERIES_BUCKET = 60
 
 
 async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
     coordinator: MarstekVenusCoordinator = hass.data[DOMAIN][entry.entry_id]
     data = coordinator.data if isinstance(coordinator.data, dict) else {}
+    data = {key: as_plain(value) for key, value in data.items()}
 
     # Host/IP is usually fine, but if you want it redacted, say so and I redact it.
     return {
         "entry": {
             "host": coordinator.host,
             "port": coordinator.port,
+            "mac": coordinator.mac,
+            "device_identifier": coordinator.device_identifier,
             "options": dict(entry.options),
         },
         "coordinator": {
             "last_update_success": coordinator.last_update_success,
         },
+        "capabilities": {
+            "identity": coordinator.scheduler.identity,
+            "source": coordinator.scheduler.capabilities_source,
+            "unsupported": sorted(coordinator.scheduler.unsupported),
+            "polled": coordinator.scheduler.polled_methods(),
+        },
+        "transport": {
+            "mismatched_replies": coordinator.scheduler.mismatched_replies,
+            **coordinator.scheduler.reliability_state(),
+            "fleet_foreign_datagrams": async_get_fleet(hass).foreign,
+        },
+        "controller": coordinator.controller.as_dict() if coordinator.controller is not None else None,
+        "stats": coordinator.scheduler.stats.as_dict(),
+        "trace": coordinator.scheduler.trace.entries(),
+        "timeseries": coordinator.scheduler.series.as_dict(_SERIES_BUCKET, time.time() - _SERIES_WINDOW),
         "data": data,
     }
@@ -1,66 +1,249 @@
 # custom_components/marstek_venus_local/discovery.py
 from __future__ import annotations
 
+import asyncio
+import ipaddress
 import json
-import socket
+import logging
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from typing import Any
 
+from homeassistant.components import network
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 
+from .codec import decode
+from .const import DOMAIN
 
-def _discover_blocking(port: int, timeout: float) -> list[dict[str, Any]]:
-    """Broadcast Marstek.GetDevice and collect responses."""
-    payload = {"id": 1, "method": "Marstek.GetDevice", "params": {}}
-    data = json.dumps(payload).encode("utf-8")
+_LOGGER = logging.getLogger(__name__)
 
-    found: dict[str, dict[str, Any]] = {}
+_PAYLOAD = json.dumps({"id": 1, "method": "Marstek.GetDevice", "params": {}}).encode("utf-8")
 
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+# Unicast sweep: datagrams per second, and the largest subnet we are willing to sweep.
+SWEEP_RATE = 200
+SWEEP_MAX_HOSTS = 1024
+_SWEEP_BATCH = 10
+
+STORAGE_KEY = f"{DOMAIN}.discovery"
+STORAGE_VERSION = 1
+
+DATA_DISCOVERY = f"{DOMAIN}_discovery"
+
+
+def sweep_hosts(subnet: str) -> list[str]:
+    """Host addresses of a CIDR; raises ValueError if invalid or too large."""
+    net = ipaddress.IPv4Network(subnet, strict=False)
+    if net.num_addresses > SWEEP_MAX_HOSTS + 2:
+        raise ValueError(f"{subnet} is larger than {SWEEP_MAX_HOSTS} hosts")
+    return [str(host) for host in net.hosts()]
+
+
+def _device_info(ip: str, parsed: Any) -> dict[str, Any]:
+    """Extract something useful for display from a Marstek.GetDevice reply."""
+    info: dict[str, Any] = {"ip": ip}
+    if isinstance(parsed, dict):
+        result = parsed.get("result")
+        if isinstance(result, dict):
+            # common guesses (depends on firmware)
+            for key in ("device_name", "name", "model", "device", "sn", "serial", "id", "mac", "wifi_mac", "ble_mac", "ver"):
+                if key in result and result[key]:
+                    info[key] = result[key]
+        info["raw"] = parsed
+    return info
+
+
+def device_mac(info: dict[str, Any] | None) -> str | None:
+    """Stable identity of a unit, from a discovery result or Marstek.GetDevice result."""
+    if not isinstance(info, dict):
+        return None
+    mac = info.get("wifi_mac") or info.get("ble_mac") or info.get("mac")
+    return str(mac).lower() if mac else None
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Queues the first reply per source IP."""
+
+    def __init__(self, queue: asyncio.Queue[dict[str, Any]]) -> None:
+        self._queue = queue
+        self._seen: set[str] = set()
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        ip = addr[0]
+        if ip in self._seen:
+            return
+        try:
+            parsed = decode(data)
+        except ValueError:
+            return
+        self._seen.add(ip)
+        self._queue.put_nowait(_device_info(ip, parsed))
+
+    def error_received(self, exc: Exception) -> None:
+        # e.g. ICMP unreachable from a swept host; irrelevant for discovery
+        _LOGGER.debug("Discovery socket error: %s", exc)
+
+
+async def _async_broadcast_targets(hass: HomeAssistant) -> set[str]:
+    """Directed broadcast address of every enabled interface, plus 255.255.255.255."""
+    targets = {"255.255.255.255"}
     try:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        s.settimeout(timeout)
+        targets.update(str(addr) for addr in await network.async_get_ipv4_broadcast_addresses(hass))
+    except Exception as err:  # noqa: BLE001 - fall back to limited broadcast only
+        _LOGGER.debug("Could not enumerate broadcast addresses: %s", err)
+    return targets
 
-        # Send to limited broadcast
-        s.sendto(data, ("255.255.255.255", int(port)))
 
-        # Collect until timeout
-        while True:
-            try:
-                resp, addr = s.recvfrom(65535)
-            except TimeoutError:
-                break
-            except OSError:
-                break
+async def _async_sweep(transport: asyncio.DatagramTransport, hosts: list[str], port: int) -> None:
+    """Unicast Marstek.GetDevice to every host, at most SWEEP_RATE per second."""
+    pause = _SWEEP_BATCH / SWEEP_RATE
+    for start in range(0, len(hosts), _SWEEP_BATCH):
+        if transport.is_closing():
+            return
+        for host in hosts[start : start + _SWEEP_BATCH]:
+            transport.sendto(_PAYLOAD, (host, port))
+        await asyncio.sleep(pause)
 
-            ip = addr[0]
-            try:
-                parsed = json.loads(resp.decode("utf-8", errors="ignore"))
-            except Exception:
-                continue
 
-            # Try to extract something useful for display
-            info: dict[str, Any] = {"ip": ip}
-            if isinstance(parsed, dict):
-                result = parsed.get("result")
-                if isinstance(result, dict):
-                    # common guesses (depends on firmware)
-                    for key in ("device_name", "name", "model", "sn", "serial", "id", "mac"):
-                        if key in result and result[key]:
-                            info[key] = result[key]
-                info["raw"] = parsed
+async def async_iter_discover(
+    hass: HomeAssistant,
+    port: int,
+    timeout: float = 2.0,
+    subnet: str | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield devices as they answer.
 
-            found[ip] = info
+    Broadcasts on every interface and, if ``subnet`` is given, sweeps it with
+    unicast requests concurrently. The window is ``timeout`` seconds after the
+    last datagram went out; consumers may stop iterating earlier.
+    """
+    hosts = sweep_hosts(subnet) if subnet else []
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _DiscoveryProtocol(queue),
+        local_addr=("0.0.0.0", 0),
+        allow_broadcast=True,
+    )
+    sweep: asyncio.Task[None] | None = None
+    try:
+        for target in await _async_broadcast_targets(hass):
+            transport.sendto(_PAYLOAD, (target, int(port)))
+        if hosts:
+            sweep = asyncio.create_task(_async_sweep(transport, hosts, int(port)))
 
+        deadline = loop.time() + timeout + len(hosts) / SWEEP_RATE
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                async with asyncio.timeout(remaining):
+                    info = await queue.get()
+            except TimeoutError:
+                break
+            yield info
     finally:
-        s.close()
-
-    return list(found.values())
+        if sweep is not None:
+            sweep.cancel()
+        transport.close()
 
 
 async def async_discover_devices(
     hass: HomeAssistant,
     port: int,
     timeout: float = 2.0,
+    subnet: str | None = None,
+    idle: float | None = None,
 ) -> list[dict[str, Any]]:
-    """Async wrapper around blocking UDP discovery."""
-    return await hass.async_add_executor_job(_discover_blocking, port, timeout)
+    """Collect discovered devices.
+
+    With ``idle`` set, return as soon as at least one device was found and no
+    further one answered for ``idle`` seconds, instead of waiting out the
+    whole window.
+    """
+    found: list[dict[str, Any]] = []
+    async with aclosing(async_iter_discover(hass, port, timeout, subnet)) as devices:
+        iterator = aiter(devices)
+        while True:
+            try:
+                if found and idle is not None:
+                    async with asyncio.timeout(idle):
+                        info = await anext(iterator)
+                else:
+                    info = await anext(iterator)
+            except (StopAsyncIteration, TimeoutError):
+                break
+            found.append(info)
+    return found
+
+
+async def async_rediscover(
+    hass: HomeAssistant,
+    mac: str,
+    port: int,
+    last_ip: str | None = None,
+    timeout: float = 2.0,
+) -> dict[str, Any] | None:
+    """Look for one unit by MAC; returns its discovery result as soon as it answers.
+
+    Besides the broadcasts, the /24 around ``last_ip`` is swept, which covers a
+    DHCP change on a network broadcasts do not reach.
+    """
+    subnet: str | None = None
+    if last_ip is not None:
+        try:
+            subnet = str(ipaddress.IPv4Network(f"{last_ip}/24", strict=False))
+        except ValueError:
+            subnet = None
+    async with aclosing(async_iter_discover(hass, port, timeout, subnet)) as devices:
+        async for info in devices:
+            if device_mac(info) == mac:
+                return info
+    return None
+
+
+class VenusDiscoveryCache:
+    """Last known address per unit (by MAC), persisted in HA storage."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._devices: dict[str, dict[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _async_ensure_loaded(self) -> dict[str, dict[str, Any]]:
+        async with self._lock:
+            if self._devices is None:
+                stored = await self._store.async_load() or {}
+                self._devices = dict(stored.get("devices", {}))
+            return self._devices
+
+    async def async_devices(self) -> list[dict[str, Any]]:
+        """Cached units, most recently seen first, shaped like discovery results."""
+        devices = await self._async_ensure_loaded()
+        return sorted(devices.values(), key=lambda d: d.get("seen", ""), reverse=True)
+
+    async def async_lookup(self, mac: str) -> dict[str, Any] | None:
+        devices = await self._async_ensure_loaded()
+        return devices.get(mac)
+
+    async def async_remember(self, found: list[dict[str, Any]], port: int) -> None:
+        """Record discovery results (and addresses learnt by polling)."""
+        devices = await self._async_ensure_loaded()
+        seen = dt_util.utcnow().isoformat()
+        changed = False
+        for info in found:
+            mac = device_mac(info)
+            if mac is None or not info.get("ip"):
+                continue
+            entry = {key: value for key, value in info.items() if key != "raw"}
+            entry.update(mac=mac, port=int(port), seen=seen)
+            devices[mac] = entry
+            changed = True
+        if changed:
+            await self._store.async_save({"devices": devices})
+
+
+def async_get_discovery_cache(hass: HomeAssistant) -> VenusDiscoveryCache:
+    cache: VenusDiscoveryCache | None = hass.data.get(DATA_DISCOVERY)
+    if cache is None:
+        cache = hass.data[DATA_DISCOVERY] = VenusDiscoveryCache(hass)
+    return cache
@@ -0,0 +1,109 @@
+# custom_components/marstek_venus_local/energy.py
+from __future__ import annotations
+
+from typing import Any
+
+# Counter -> (power it integrates, direction, device total that re-anchors it).
+# "ongrid" is ongrid_power (positive: the unit feeds the grid side); "ac" adds
+# offgrid_power, so charge/discharge cover both outputs of the unit.
+ENERGY_COUNTERS: dict[str, tuple[str, int, str | None]] = {
+    "export": ("ongrid", 1, "total_grid_output_energy"),
+    "import": ("ongrid", -1, "total_grid_input_energy"),
+    "discharge": ("ac", 1, None),
+    "charge": ("ac", -1, None),
+}
+
+# Samples further apart than this (seconds) are not integrated; the device
+# totals cover the gap.
+MAX_GAP = 600.0
+
+
+def _split_trapezoid(p0: float, p1: float, hours: float) -> tuple[float, float]:
+    """Energy (Wh) above and below zero of a linear power ramp from p0 to p1."""
+    if p0 >= 0 and p1 >= 0:
+        return (p0 + p1) / 2 * hours, 0.0
+    if p0 <= 0 and p1 <= 0:
+        return 0.0, -(p0 + p1) / 2 * hours
+    # Sign change: split the ramp at its zero crossing.
+    cross = hours * p0 / (p0 - p1)
+    first, second = p0 * cross / 2, p1 * (hours - cross) / 2
+    return (first, -second) if p0 > 0 else (second, -first)
+
+
+class EnergyIntegrator:
+    """Import/export/charge/discharge energy (Wh) from ES.GetStatus power samples.
+
+    Between two samples the power is integrated with the trapezoidal rule.
+    Export and import are anchored to the device's grid output/input totals:
+    whenever a total changes, the counter restarts from it, so integration
+    error cannot accumulate past one firmware update of the total. Shown
+    values never decrease; if integration ran ahead of the device, the
+    counter holds until the total catches up.
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[str, float] = dict.fromkeys(ENERGY_COUNTERS, 0.0)
+        # Last anchor (device total plus offset, or restored value) and energy integrated since.
+        self._anchor: dict[str, float] = dict.fromkeys(ENERGY_COUNTERS, 0.0)
+        self._since: dict[str, float] = dict.fromkeys(ENERGY_COUNTERS, 0.0)
+        # Added to a device total after it went backwards (firmware reset).
+        self._offset: dict[str, float] = {name: 0.0 for name, spec in ENERGY_COUNTERS.items() if spec[2]}
+        self._totals: dict[str, float] = {}
+        self._last: tuple[float, float, float] | None = None
+
+    def restore(self, data: dict[str, Any] | None) -> None:
+        """Continue from persisted counters (see ``as_dict``)."""
+        if not isinstance(data, dict):
+            return
+        for name in ENERGY_COUNTERS:
+            value = data.get(name)
+            if isinstance(value, (int, float)):
+                self._values[name] = self._anchor[name] = float(value)
+        offsets = data.get("offsets")
+        totals = data.get("totals")
+        for name in self._offset:
+            if isinstance(offsets, dict) and isinstance(offsets.get(name), (int, float)):
+                self._offset[name] = float(offsets[name])
+            # The last device total seen, so a reset during downtime is still noticed.
+            if isinstance(totals, dict) and isinstance(totals.get(name), (int, float)):
+                self._totals[name] = float(totals[name])
+
+    def record(self, key: str, status: Any, now: float) -> dict[str, Any] | None:
+        """Fold in an ES.GetStatus result taken at ``now`` (monotonic); the updated counters."""
+        if key != "es" or status is None:
+            return None
+        ongrid = status.get("ongrid_power")
+        if isinstance(ongrid, (int, float)):
+            offgrid = status.get("offgrid_power")
+            ac = ongrid + (offgrid if isinstance(offgrid, (int, float)) else 0)
+            last = self._last
+            if last is not None and 0 < now - last[0] <= MAX_GAP:
+                hours = (now - last[0]) / 3600
+                powers = {
+                    "ongrid": _split_trapezoid(last[1], ongrid, hours),
+                    "ac": _split_trapezoid(last[2], ac, hours),
+                }
+                for name, (source, direction, _) in ENERGY_COUNTERS.items():
+                    above, below = powers[source]
+                    self._since[name] += above if direction > 0 else below
+            self._last = (now, ongrid, ac)
+
+        for name, (_, _, total_field) in ENERGY_COUNTERS.items():
+            total = status.get(total_field) if total_field else None
+            if isinstance(total, (int, float)) and not isinstance(total, bool):
+                previous = self._totals.get(name)
+                if previous is not None and total < previous:
+                    self._offset[name] += previous - total
+                if total != previous:
+                    self._anchor[name] = total + self._offset[name]
+                    self._since[name] = 0.0
+                self._totals[name] = total
+            self._values[name] = max(self._values[name], self._anchor[name] + self._since[name])
+        return self.as_dict()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **{name: round(value, 1) for name, value in self._values.items()},
+            "offsets": dict(self._offset),
+            "totals": dict(self._totals),
+        }
@@ -0,0 +1,122 @@
+# custom_components/marstek_venus_local/methods.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from .const import (
+    CONF_ES_STATUS_INTERVAL,
+    CONF_BAT_STATUS_INTERVAL,
+    CONF_ES_MODE_INTERVAL,
+    CONF_EM_STATUS_INTERVAL,
+    CONF_PV_STATUS_INTERVAL,
+    CONF_WIFI_STATUS_INTERVAL,
+    CONF_DEVICE_INFO_INTERVAL,
+    DEFAULT_ES_STATUS_INTERVAL,
+    DEFAULT_BAT_STATUS_INTERVAL,
+    DEFAULT_ES_MODE_INTERVAL,
+    DEFAULT_EM_STATUS_INTERVAL,
+    DEFAULT_PV_STATUS_INTERVAL,
+    DEFAULT_WIFI_STATUS_INTERVAL,
+    DEFAULT_DEVICE_INFO_INTERVAL,
+)
+from .status import BatStatus, EsStatus, ModeStatus, VenusStatus
+
+
+@dataclass(frozen=True, kw_only=True)
+class VenusPollMethod:
+    """A pollable RPC method.
+
+    ``key`` is where the result lands in the coordinator data (and its
+    change-tracking section); ``priority`` breaks ties when several methods
+    are due at once (lower first). Methods with ``enabled=False`` are only
+    polled once an entity declares it consumes them. With ``status`` set,
+    results are decoded into that snapshot class instead of kept as dicts.
+    """
+
+    method: str
+    key: str
+    interval_option: str
+    default_interval: int
+    priority: int
+    enabled: bool = True
+    params: dict[str, Any] = field(default_factory=lambda: {"id": 0})
+    status: type[VenusStatus] | None = None
+
+    @property
+    def ok_key(self) -> str:
+        return f"last_{self.key}_ok"
+
+    def decode(self, result: Any) -> Any:
+        if self.status is not None and isinstance(result, dict):
+            return self.status(result)
+        return result
+
+
+POLL_METHODS: tuple[VenusPollMethod, ...] = (
+    VenusPollMethod(
+        method="ES.GetStatus",
+        key="es",
+        interval_option=CONF_ES_STATUS_INTERVAL,
+        default_interval=DEFAULT_ES_STATUS_INTERVAL,
+        status=EsStatus,
+        priority=0,
+    ),
+    VenusPollMethod(
+        method="Bat.GetStatus",
+        key="bat",
+        interval_option=CONF_BAT_STATUS_INTERVAL,
+        default_interval=DEFAULT_BAT_STATUS_INTERVAL,
+        status=BatStatus,
+        priority=1,
+    ),
+    VenusPollMethod(
+        method="ES.GetMode",
+        key="mode",
+        interval_option=CONF_ES_MODE_INTERVAL,
+        default_interval=DEFAULT_ES_MODE_INTERVAL,
+        status=ModeStatus,
+        priority=2,
+    ),
+    VenusPollMethod(
+        method="EM.GetStatus",
+        key="em",
+        interval_option=CONF_EM_STATUS_INTERVAL,
+        default_interval=DEFAULT_EM_STATUS_INTERVAL,
+        priority=3,
+        enabled=False,
+    ),
+    VenusPollMethod(
+        method="PV.GetStatus",
+        key="pv",
+        interval_option=CONF_PV_STATUS_INTERVAL,
+        default_interval=DEFAULT_PV_STATUS_INTERVAL,
+        priority=4,
+        enabled=False,
+    ),
+    VenusPollMethod(
+        method="Wifi.GetStatus",
+        key="wifi",
+        interval_option=CONF_WIFI_STATUS_INTERVAL,
+        default_interval=DEFAULT_WIFI_STATUS_INTERVAL,
+        priority=5,
+        enabled=False,
+    ),
+    VenusPollMethod(
+        method="Marstek.GetDevice",
+        key="device_info",
+        interval_option=CONF_DEVICE_INFO_INTERVAL,
+        default_interval=DEFAULT_DEVICE_INFO_INTERVAL,
+        priority=6,
+        enabled=False,
+        params={"ble_mac": "0"},
+    ),
+)
+
+METHODS_BY_NAME: dict[str, VenusPollMethod] = {m.method: m for m in POLL_METHODS}
+METHODS_BY_KEY: dict[str, VenusPollMethod] = {m.key: m for m in POLL_METHODS}
+
+
+def default_interval_options() -> dict[str, int]:
+    """Options a fresh config entry starts with."""
+    return {m.interval_option: m.default_interval for m in POLL_METHODS}
@@ -0,0 +1,100 @@
+# custom_components/marstek_venus_local/number.py
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.components.number import NumberEntity, NumberEntityDescription, NumberMode
+from homeassistant.const import UnitOfPower
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import entity_platform
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DEFAULT_PASSIVE_CD_TIME, DOMAIN, PASSIVE_POWER_MAX, SERVICE_SET_POWER
+from .coordinator import MarstekVenusCoordinator
+
+POWER_SETPOINT = NumberEntityDescription(
+    key="passive_power",
+    name="Passive power",
+    native_min_value=-PASSIVE_POWER_MAX,
+    native_max_value=PASSIVE_POWER_MAX,
+    native_step=1,
+    native_unit_of_measurement=UnitOfPower.WATT,
+    mode=NumberMode.BOX,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities,
+) -> None:
+    coordinator: MarstekVenusCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    device_identifier = coordinator.device_identifier
+    device_info = DeviceInfo(
+        identifiers={(DOMAIN, device_identifier)},
+        name="Marstek Venus E 3.0",
+        manufacturer="Marstek",
+        model="Venus E 3.0",
+    )
+
+    async_add_entities([MarstekVenusPowerNumber(coordinator, device_identifier, device_info, POWER_SETPOINT)])
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_SET_POWER,
+        {
+            vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(-PASSIVE_POWER_MAX, PASSIVE_POWER_MAX)),
+            vol.Optional("cd_time", default=DEFAULT_PASSIVE_CD_TIME): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        },
+        "async_set_power",
+    )
+
+
+class MarstekVenusPowerNumber(CoordinatorEntity[MarstekVenusCoordinator], NumberEntity):
+    """Passive-mode power setpoint; positive discharges, negative charges.
+
+    Shows the last setpoint the device confirmed, unknown outside passive mode.
+    """
+
+    def __init__(
+        self,
+        coordinator: MarstekVenusCoordinator,
+        device_identifier: str,
+        device_info: DeviceInfo,
+        desc: NumberEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = desc
+        self._device_info = device_info
+
+        self._attr_unique_id = f"{device_identifier}:{desc.key}"
+        self._attr_name = f"Venus {desc.name}"
+
+        self._written: tuple[int | None, bool] | None = None
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return self._device_info
+
+    @property
+    def native_value(self) -> float | None:
+        return self.coordinator.scheduler.passive_setpoint
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        written = (self.native_value, self.available)
+        if written == self._written:
+            return
+        self._written = written
+        self.async_write_ha_state()
+
+    async def async_set_native_value(self, value: float) -> None:
+        await self.async_set_power(int(value), DEFAULT_PASSIVE_CD_TIME)
+
+    async def async_set_power(self, power: int, cd_time: int = DEFAULT_PASSIVE_CD_TIME) -> None:
+        ok = await self.coordinator.async_set_passive_power(power, cd_time)
+        if not ok:
+            self.coordinator.logger.warning("Failed to set passive power to %s W", power)
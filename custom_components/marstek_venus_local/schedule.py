@@ -0,0 +1,87 @@
+# custom_components/marstek_venus_local/schedule.py
+from __future__ import annotations
+
+import re
+from typing import Any
+
+# ES.SetMode Manual holds this many time slots (time_num 0..9).
+MANUAL_SLOTS = 10
+
+# week_set bit order: bit 0 is Monday, 127 means every day.
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+_TIME = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)$")
+
+
+def _time(value: Any) -> str:
+    match = _TIME.match(str(value).strip())
+    if match is None:
+        raise ValueError(f"Invalid time {value!r}, expected HH:MM")
+    return f"{int(match.group(1)):02d}:{match.group(2)}"
+
+
+def week_set(days: Any) -> int:
+    """week_set bitmask from an int or a list of weekday names."""
+    if isinstance(days, int):
+        if not 0 <= days <= 127:
+            raise ValueError(f"Invalid week_set {days}")
+        return days
+    mask = 0
+    for day in days:
+        try:
+            mask |= 1 << WEEKDAYS.index(str(day).lower()[:3])
+        except ValueError:
+            raise ValueError(f"Invalid weekday {day!r}") from None
+    return mask
+
+
+def disabled_slot(time_num: int) -> dict[str, Any]:
+    return {"time_num": time_num, "start_time": "00:00", "end_time": "00:00", "week_set": 0, "power": 0, "enable": 0}
+
+
+def manual_slot(slot: dict[str, Any]) -> dict[str, Any]:
+    """manual_cfg for one slot, in the form the device takes; raises ValueError.
+
+    Accepts ``days`` (weekday names) instead of ``week_set``; power is in W.
+    """
+    time_num = int(slot["time_num"])
+    if not 0 <= time_num < MANUAL_SLOTS:
+        raise ValueError(f"Invalid time_num {time_num}, expected 0..{MANUAL_SLOTS - 1}")
+    if not slot.get("enable", True):
+        return disabled_slot(time_num)
+    days = slot["week_set"] if "week_set" in slot else slot.get("days", WEEKDAYS)
+    return {
+        "time_num": time_num,
+        "start_time": _time(slot["start_time"]),
+        "end_time": _time(slot["end_time"]),
+        "week_set": week_set(days),
+        "power": int(slot["power"]),
+        "enable": 1,
+    }
+
+
+def full_schedule(slots: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Normalise a weekly schedule; slots it leaves out are disabled.
+
+    Keyed by str(time_num), like the cached copy in the scheduler's data.
+    """
+    schedule = {str(n): disabled_slot(n) for n in range(MANUAL_SLOTS)}
+    for slot in slots:
+        cfg = manual_slot(slot)
+        schedule[str(cfg["time_num"])] = cfg
+    return schedule
+
+
+def same_slot(a: dict[str, Any] | None, b: dict[str, Any]) -> bool:
+    """Whether writing ``b`` over ``a`` would change anything (disabled slots are all alike)."""
+    if a is None:
+        return False
+    if not a.get("enable") and not b.get("enable"):
+        return True
+    return a == b
+
+
+def changed_slots(cached: dict[str, Any] | None, schedule: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    """Slots of ``schedule`` that differ from (or are unknown in) the cached copy."""
+    cached = cached or {}
+    return [cfg for key, cfg in schedule.items() if not same_slot(cached.get(key), cfg)]
@@ -10,20 +10,32 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfPower, UnitOfTemperature, PERCENTAGE
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .coordinator import MarstekVenusCoordinator, dig
+from .coordinator import STATS_FEED, MarstekVenusCoordinator, compile_path, section_of
+from .methods import METHODS_BY_KEY
 
 
 @dataclass(frozen=True, kw_only=True)
 class VenusSensorEntityDescription(SensorEntityDescription):
     path: str
+    # RPC method feeding this sensor; derived from the path's data key when omitted.
+    method: str | None = None
 
 
 # ---- Sensors ----
@@ -107,12 +119,232 @@ SENSORS: list[VenusSensorEntityDescription] = [
         state_class=SensorStateClass.TOTAL_INCREASING,
     ),
 
+    # Integrated between ES.GetStatus polls (energy.py); import/export re-anchor to the totals above
+    VenusSensorEntityDescription(
+        key="energy_import",
+        name="energy_import",
+        path="energy.import",
+        native_unit_of_measurement="Wh",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    VenusSensorEntityDescription(
+        key="energy_export",
+        name="energy_export",
+        path="energy.export",
+        native_unit_of_measurement="Wh",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    VenusSensorEntityDescription(
+        key="energy_charge",
+        name="energy_charge",
+        path="energy.charge",
+        native_unit_of_measurement="Wh",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    VenusSensorEntityDescription(
+        key="energy_discharge",
+        name="energy_discharge",
+        path="energy.discharge",
+        native_unit_of_measurement="Wh",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+
     # Mode (ES.GetMode)
     VenusSensorEntityDescription(key="mode", name="mode", path="mode.mode"),
+
+    # Energy meter (EM.GetStatus) - only polled when one of these is enabled
+    VenusSensorEntityDescription(
+        key="em_total_power",
+        name="em_total_power",
+        path="em.total_power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="em_a_power",
+        name="em_a_power",
+        path="em.a_power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="em_b_power",
+        name="em_b_power",
+        path="em.b_power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="em_c_power",
+        name="em_c_power",
+        path="em.c_power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+
+    # PV (PV.GetStatus)
+    VenusSensorEntityDescription(
+        key="pv_power",
+        name="pv_power",
+        path="pv.pv_power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="pv_voltage",
+        name="pv_voltage",
+        path="pv.pv_voltage",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="pv_current",
+        name="pv_current",
+        path="pv.pv_current",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+
+    # Wifi (Wifi.GetStatus)
+    VenusSensorEntityDescription(
+        key="wifi_rssi",
+        name="wifi_rssi",
+        path="wifi.rssi",
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+
+    # Rolling aggregates (aggregates.AGGREGATES), refreshed with their section
+    VenusSensorEntityDescription(
+        key="ongrid_power_mean_5m",
+        name="ongrid_power_mean_5m",
+        path="es_agg.ongrid_power_mean_5m",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    VenusSensorEntityDescription(
+        key="ongrid_power_min_5m",
+        name="ongrid_power_min_5m",
+        path="es_agg.ongrid_power_min_5m",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="ongrid_power_max_5m",
+        name="ongrid_power_max_5m",
+        path="es_agg.ongrid_power_max_5m",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="ongrid_power_p95_1h",
+        name="ongrid_power_p95_1h",
+        path="es_agg.ongrid_power_p95_1h",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="bat_temp_min_24h",
+        name="bat_temp_min_24h",
+        path="bat_agg.bat_temp_min_24h",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="bat_temp_max_24h",
+        name="bat_temp_max_24h",
+        path="bat_agg.bat_temp_max_24h",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+
+    # Request statistics (diagnostic, opt-in)
+    VenusSensorEntityDescription(
+        key="requests_sent",
+        name="requests_sent",
+        path="stats.sent",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="requests_timeout",
+        name="requests_timeout",
+        path="stats.timeout",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="requests_mismatched",
+        name="requests_mismatched",
+        path="stats.mismatched",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="rtt_p50",
+        name="rtt_p50",
+        path="stats.rtt_p50_ms",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    VenusSensorEntityDescription(
+        key="rtt_p99",
+        name="rtt_p99",
+        path="stats.rtt_p99_ms",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+
+    # Device (Marstek.GetDevice)
+    VenusSensorEntityDescription(
+        key="firmware",
+        name="firmware",
+        path="device_info.ver",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
 ]
 
-# Diese Keys bekommen KEINE _stable Version mehr:
-NO_STABLE_KEYS: set[str] = {
+# Diese Keys halten nie den letzten Wert (auch mit hold_last_value):
+NO_HOLD_KEYS: set[str] = {
     "device",
     "rated_capacity",
     "last_bat_ok",
@@ -120,13 +352,27 @@ NO_STABLE_KEYS: set[str] = {
     "last_es_ok",
     "last_mode_ok",
     "last_request",
+    "em_total_power",
+    "em_a_power",
+    "em_b_power",
+    "em_c_power",
+    "pv_power",
+    "pv_voltage",
+    "pv_current",
+    "wifi_rssi",
+    "firmware",
+    "requests_sent",
+    "requests_timeout",
+    "requests_mismatched",
+    "rtt_p50",
+    "rtt_p99",
 }
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> None:
     coordinator: MarstekVenusCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    device_identifier = f"{coordinator.host}:{coordinator.port}"
+    device_identifier = coordinator.device_identifier
     device_info = DeviceInfo(
         identifiers={(DOMAIN, device_identifier)},
         name="Marstek Venus E 3.0",
@@ -134,16 +380,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         model="Venus E 3.0",
     )
 
-    entities: list[SensorEntity] = []
-    for desc in SENSORS:
-        # normale Sensoren immer
-        entities.append(MarstekVenusSensor(coordinator, device_identifier, device_info, desc, stable=False))
+    # One entity per sensor; whether it holds its last value is an entry option.
+    hold = coordinator.hold_last_value
+    entities: list[SensorEntity] = [
+        MarstekVenusSensor(coordinator, device_identifier, device_info, desc, hold=hold and desc.key not in NO_HOLD_KEYS)
+        for desc in SENSORS
+    ]
 
-        # stable Sensoren nur, wenn nicht ausgeschlossen
-        if desc.key not in NO_STABLE_KEYS:
-            entities.append(MarstekVenusSensor(coordinator, device_identifier, device_info, desc, stable=True))
-
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class MarstekVenusSensor(CoordinatorEntity[MarstekVenusCoordinator], SensorEntity, RestoreEntity):
@@ -155,19 +399,25 @@ class MarstekVenusSensor(CoordinatorEntity[MarstekVenusCoordinator], SensorEntit
         device_identifier: str,
         device_info: DeviceInfo,
         desc: VenusSensorEntityDescription,
-        stable: bool,
+        hold: bool,
     ) -> None:
         super().__init__(coordinator)
         self._device_info = device_info
         self.entity_description = desc
-        self._stable = stable
+        self._hold = hold
+
+        self._attr_unique_id = f"{device_identifier}:{desc.key}"
+        self._attr_name = f"Venus {desc.name}"
 
-        suffix = "_stable" if stable else ""
-        self._attr_unique_id = f"{device_identifier}:{desc.key}{suffix}"
-        self._attr_name = f"Venus {desc.name}{suffix}"
+        # Only write state when the data section this entity reads from changed.
+        self._section = section_of(desc.path)
+        self._read = compile_path(desc.path)
+        self._written: tuple[int, bool] | None = None
 
-        self._last_native_value: Any | None = None
-        self._has_value = False
+        poll = METHODS_BY_KEY.get(self._section)
+        self._method = desc.method or (poll.method if poll is not None else None)
+        if self._section == STATS_FEED:
+            self._method = STATS_FEED
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -176,43 +426,51 @@ class MarstekVenusSensor(CoordinatorEntity[MarstekVenusCoordinator], SensorEntit
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
 
-        # For stable sensors: restore last state so they don't start as unknown after restart.
-        if self._stable:
+        # Tell the scheduler this method has a reader; unread methods are not polled.
+        if self._method is not None:
+            self.async_on_remove(self.coordinator.async_add_consumer(self._method))
+
+        # Holding sensors: restore last state so they don't start as unknown after restart.
+        # Paths covered by the coordinator's persisted snapshot need no lookup.
+        path = self.entity_description.path
+        if self._hold and not self.coordinator.values.has_value(path) and self._read(self.coordinator.data or {}) is None:
             last = await self.async_get_last_state()
             if last is not None and last.state not in (None, "unknown", "unavailable"):
-                self._last_native_value = last.state
-                self._has_value = True
+                self.coordinator.values.seed(path, last.state)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        written = (self.coordinator.section_version(self._section), self.available)
+        if written == self._written:
+            return
+        self._written = written
+        self.async_write_ha_state()
 
     @property
     def available(self) -> bool:
-        # Stable sensors: once we have any value (restored or received), never go unavailable.
-        if self._stable and self._has_value:
+        # Holding sensors: once we have any value (restored or received), never go unavailable.
+        if self._hold and self.coordinator.values.has_value(self.entity_description.path):
             return True
         return self.coordinator.last_update_success
 
     @property
     def native_value(self):
-        data = self.coordinator.data
-        if not isinstance(data, dict):
-            return self._last_native_value if (self._stable and self._has_value) else None
-
-        val = dig(data, self.entity_description.path)
-
-        # If no new value: stable keeps old; non-stable becomes None
+        # Holding: last good value; otherwise None when the field is missing
+        val = self.coordinator.values.get(self.entity_description.path, self._read, self._section, self._hold)
         if val is None:
-            return self._last_native_value if (self._stable and self._has_value) else None
+            return None
 
         # Normalize numbers similarly to your current behavior
         if isinstance(val, (int, float)):
-            if self.entity_description.device_class == SensorDeviceClass.TEMPERATURE:
+            if self.entity_description.device_class in (
+                SensorDeviceClass.TEMPERATURE,
+                SensorDeviceClass.VOLTAGE,
+                SensorDeviceClass.CURRENT,
+            ):
                 val_norm: Any = float(val)
             else:
                 val_norm = int(round(float(val), 0))
         else:
             val_norm = val
 
-        if self._stable:
-            self._last_native_value = val_norm
-            self._has_value = True
-
         return val_norm
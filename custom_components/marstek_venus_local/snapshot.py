@@ -0,0 +1,37 @@
+# custom_components/marstek_venus_local/snapshot.py
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .status import as_plain
+
+STORAGE_VERSION = 1
+
+# Data sections persisted across restarts (manual: the cached schedule, energy: the
+# integrated counters), and how long writes are debounced (seconds).
+SNAPSHOT_KEYS = ("es", "bat", "mode", "manual", "energy")
+SNAPSHOT_SAVE_DELAY = 60
+
+
+class VenusSnapshotStore:
+    """Last good es/bat/mode results of one config entry, persisted in HA storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry_id}")
+
+    async def async_load(self) -> dict[str, Any]:
+        stored = await self._store.async_load() or {}
+        return {key: stored[key] for key in SNAPSHOT_KEYS if isinstance(stored.get(key), dict)}
+
+    def async_schedule_save(self, data: dict[str, Any]) -> None:
+        """Debounced write; ``data`` is read when the write actually happens."""
+        self._store.async_delay_save(
+            lambda: {key: as_plain(data.get(key)) for key in SNAPSHOT_KEYS}, SNAPSHOT_SAVE_DELAY
+        )
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
@@ -0,0 +1,126 @@
+# custom_components/marstek_venus_local/stats.py
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# RTT histogram bucket upper bounds (milliseconds); one extra overflow bucket follows.
+RTT_BUCKETS_MS: tuple[float, ...] = (10, 25, 50, 100, 250, 500, 1000, 2000, 5000)
+
+
+class MethodStats:
+    """Counters and a fixed-bucket RTT histogram for one RPC method."""
+
+    __slots__ = ("sent", "ok", "error", "timeout", "mismatched", "rtt_buckets", "rtt_sum")
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.ok = 0
+        self.error = 0
+        self.timeout = 0
+        self.mismatched = 0
+        self.rtt_buckets = [0] * (len(RTT_BUCKETS_MS) + 1)
+        self.rtt_sum = 0.0
+
+    def add_rtt(self, rtt: float) -> None:
+        self.rtt_buckets[bisect_left(RTT_BUCKETS_MS, rtt * 1000)] += 1
+        self.rtt_sum += rtt
+
+    def rtt_percentile(self, q: float) -> float | None:
+        """Upper bound (ms) of the bucket holding the q-quantile; None without samples.
+
+        The overflow bucket reports the largest bound.
+        """
+        total = sum(self.rtt_buckets)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(self.rtt_buckets):
+            seen += count
+            if seen >= rank:
+                return RTT_BUCKETS_MS[min(index, len(RTT_BUCKETS_MS) - 1)]
+        return RTT_BUCKETS_MS[-1]
+
+    def as_dict(self) -> dict[str, Any]:
+        samples = sum(self.rtt_buckets)
+        return {
+            "sent": self.sent,
+            "ok": self.ok,
+            "error": self.error,
+            "timeout": self.timeout,
+            "mismatched": self.mismatched,
+            "rtt_mean_ms": self.rtt_sum / samples * 1000 if samples else None,
+            "rtt_histogram_ms": dict(
+                zip([*map(str, RTT_BUCKETS_MS), "inf"], self.rtt_buckets, strict=True)
+            ),
+        }
+
+
+class WaitStats:
+    """How often and how long something waited."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"count": self.count, "total_s": self.total, "max_s": self.max}
+
+
+class SchedulerStats:
+    """Hot-path instrumentation of one VenusScheduler, in constant memory."""
+
+    def __init__(self, methods: list[str]) -> None:
+        self.methods: dict[str, MethodStats] = {method: MethodStats() for method in methods}
+        self.gap_wait = WaitStats()
+        self.lock_wait = WaitStats()
+
+    def method(self, method: str) -> MethodStats:
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = self.methods[method] = MethodStats()
+        return stats
+
+    def record_mismatch(self, method: str | None) -> None:
+        if method is not None:
+            self.method(method).mismatched += 1
+
+    def summary(self) -> dict[str, Any]:
+        """Totals across methods, for the diagnostic sensors."""
+        merged = MethodStats()
+        for stats in self.methods.values():
+            merged.sent += stats.sent
+            merged.ok += stats.ok
+            merged.error += stats.error
+            merged.timeout += stats.timeout
+            merged.mismatched += stats.mismatched
+            for index, count in enumerate(stats.rtt_buckets):
+                merged.rtt_buckets[index] += count
+        return {
+            "sent": merged.sent,
+            "ok": merged.ok,
+            "error": merged.error,
+            "timeout": merged.timeout,
+            "mismatched": merged.mismatched,
+            "rtt_p50_ms": merged.rtt_percentile(0.5),
+            "rtt_p99_ms": merged.rtt_percentile(0.99),
+            "gap_wait_s": round(self.gap_wait.total, 3),
+            "lock_wait_s": round(self.lock_wait.total, 3),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "methods": {method: stats.as_dict() for method, stats in self.methods.items()},
+            "min_gap_wait": self.gap_wait.as_dict(),
+            "lock_wait": self.lock_wait.as_dict(),
+        }
@@ -0,0 +1,93 @@
+# custom_components/marstek_venus_local/status.py
+from __future__ import annotations
+
+from typing import Any
+
+
+class VenusStatus:
+    """Decoded result of one status reply.
+
+    Fields the integration knows live in slots; anything else the firmware
+    sends is kept in ``extra`` so diagnostics still show the whole reply.
+    """
+
+    __slots__ = ("extra",)
+    FIELDS: tuple[str, ...] = ()
+    _FIELD_SET: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, result: dict[str, Any]) -> None:
+        known = self._FIELD_SET
+        extra: dict[str, Any] = {}
+        for name in self.FIELDS:
+            setattr(self, name, None)
+        for name, value in result.items():
+            if name in known:
+                setattr(self, name, value)
+            else:
+                extra[name] = value
+        self.extra = extra
+
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in self._FIELD_SET:
+            return getattr(self, name)
+        return self.extra.get(name, default)
+
+    def as_dict(self) -> dict[str, Any]:
+        """The reply as received (minus fields that were null)."""
+        out = {name: value for name in self.FIELDS if (value := getattr(self, name)) is not None}
+        out.update(self.extra)
+        return out
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS) and (
+            self.extra == other.extra  # type: ignore[attr-defined]
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class EsStatus(VenusStatus):
+    """ES.GetStatus result."""
+
+    FIELDS = (
+        "id",
+        "bat_soc",
+        "bat_cap",
+        "pv_power",
+        "ongrid_power",
+        "offgrid_power",
+        "bat_power",
+        "total_pv_energy",
+        "total_grid_output_energy",
+        "total_grid_input_energy",
+        "total_load_energy",
+    )
+    __slots__ = FIELDS
+
+
+class BatStatus(VenusStatus):
+    """Bat.GetStatus result."""
+
+    FIELDS = ("id", "soc", "charg_flag", "dischrg_flag", "bat_temp", "bat_capacity", "rated_capacity")
+    __slots__ = FIELDS
+
+
+class ModeStatus(VenusStatus):
+    """ES.GetMode result."""
+
+    FIELDS = ("id", "mode", "ongrid_power", "offgrid_power", "bat_soc")
+    __slots__ = FIELDS
+
+
+def as_plain(value: Any) -> Any:
+    """JSON-friendly form of a data value (for storage and diagnostics)."""
+    return value.as_dict() if isinstance(value, VenusStatus) else value
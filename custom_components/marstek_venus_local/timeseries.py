@@ -0,0 +1,159 @@
+# custom_components/marstek_venus_local/timeseries.py
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from typing import Any
+
+# Samples kept per field; each costs 12 bytes (float64 time + float32 value).
+TIMESERIES_CAPACITY = 2048
+
+# Numeric fields recorded per data key.
+SERIES_FIELDS: dict[str, tuple[str, ...]] = {
+    "es": ("ongrid_power", "offgrid_power", "bat_power", "pv_power", "bat_soc"),
+    "bat": ("soc", "bat_temp"),
+    "em": ("total_power", "a_power", "b_power", "c_power"),
+    "pv": ("pv_power",),
+}
+
+
+class SampleRing:
+    """Fixed-capacity ring of (timestamp, value) samples in two flat arrays.
+
+    Timestamps must not decrease; range queries binary-search them, so a
+    sample older than the newest one is stored at the newest timestamp.
+    Memory is allocated once, so the footprint does not depend on how long
+    the integration has been running.
+    """
+
+    __slots__ = ("_ts", "_values", "_start", "_count")
+
+    def __init__(self, capacity: int = TIMESERIES_CAPACITY) -> None:
+        self._ts = array("d", bytes(8 * capacity))
+        self._values = array("f", bytes(4 * capacity))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return len(self._ts)
+
+    @property
+    def nbytes(self) -> int:
+        return self._ts.itemsize * len(self._ts) + self._values.itemsize * len(self._values)
+
+    def append(self, ts: float, value: float) -> None:
+        capacity = len(self._ts)
+        if self._count < capacity:
+            index = (self._start + self._count) % capacity
+            self._count += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % capacity
+        if self._count > 1:
+            ts = max(ts, self._ts[(index - 1) % capacity])
+        self._ts[index] = ts
+        self._values[index] = value
+
+    def latest(self) -> tuple[float, float] | None:
+        if not self._count:
+            return None
+        index = (self._start + self._count - 1) % len(self._ts)
+        return self._ts[index], self._values[index]
+
+    def _bisect(self, ts: float) -> int:
+        """Logical position of the first sample at or after ``ts``."""
+        capacity = len(self._ts)
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._ts[(self._start + mid) % capacity] < ts:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def range(self, start: float | None = None, end: float | None = None) -> list[tuple[float, float]]:
+        """Samples with ``start <= ts < end``, oldest first."""
+        first = self._bisect(start) if start is not None else 0
+        last = self._bisect(end) if end is not None else self._count
+        capacity = len(self._ts)
+        out = []
+        for pos in range(first, last):
+            index = (self._start + pos) % capacity
+            out.append((self._ts[index], self._values[index]))
+        return out
+
+    def downsample(
+        self, bucket: float, start: float | None = None, end: float | None = None
+    ) -> list[tuple[float, float, float, float]]:
+        """(bucket start, mean, min, max) per ``bucket`` seconds that holds samples.
+
+        Buckets are aligned to multiples of ``bucket``.
+        """
+        out: list[tuple[float, float, float, float]] = []
+        current = math.nan
+        total = low = high = 0.0
+        count = 0
+        for ts, value in self.range(start, end):
+            key = ts - ts % bucket
+            if key != current:
+                if count:
+                    out.append((current, total / count, low, high))
+                current, total, low, high, count = key, 0.0, value, value, 0
+            total += value
+            count += 1
+            low = min(low, value)
+            high = max(high, value)
+        if count:
+            out.append((current, total / count, low, high))
+        return out
+
+
+class TimeSeries:
+    """One SampleRing per recorded field, keyed "es.ongrid_power" like entity paths.
+
+    Samples are stamped on the monotonic clock shifted to wall time once at
+    construction, so an NTP step cannot reorder them; the stamps drift from
+    wall time by however far the system clock has been adjusted since.
+    """
+
+    def __init__(self, capacity: int = TIMESERIES_CAPACITY) -> None:
+        self._epoch = time.time() - time.monotonic()
+        self.rings: dict[str, SampleRing] = {
+            f"{key}.{name}": SampleRing(capacity) for key, names in SERIES_FIELDS.items() for name in names
+        }
+        self._paths = {key: [(name, self.rings[f"{key}.{name}"]) for name in names] for key, names in SERIES_FIELDS.items()}
+
+    def record(self, key: str, status: Any, now: float) -> None:
+        """Append the recorded fields of a decoded ``key`` result sampled at monotonic ``now``."""
+        fields = self._paths.get(key)
+        if fields is None or status is None:
+            return
+        ts = now + self._epoch
+        for name, ring in fields:
+            value = status.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                ring.append(ts, value)
+
+    def get(self, path: str) -> SampleRing | None:
+        return self.rings.get(path)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ring.nbytes for ring in self.rings.values())
+
+    def as_dict(self, bucket: float, start: float | None = None) -> dict[str, Any]:
+        """Per non-empty field: sample count and a downsampled history (for diagnostics)."""
+        return {
+            path: {
+                "samples": len(ring),
+                "buckets": [[round(v, 3) for v in row] for row in ring.downsample(bucket, start)],
+            }
+            for path, ring in self.rings.items()
+            if len(ring)
+        }
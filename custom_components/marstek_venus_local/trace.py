@@ -0,0 +1,80 @@
+# custom_components/marstek_venus_local/trace.py
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# Exchanges kept per device, and payload characters kept per exchange when dumped.
+TRACE_SIZE = 128
+TRACE_PAYLOAD_CHARS = 512
+
+
+class TraceEntry:
+    """One request/response exchange; slots are reused, never reallocated."""
+
+    __slots__ = ("method", "rpc_id", "sent", "rtt", "result", "payload")
+
+    def __init__(self) -> None:
+        self.method: str | None = None
+        self.rpc_id: int | None = None
+        self.sent = 0.0
+        self.rtt: float | None = None
+        self.result: str | None = None
+        self.payload: Any = None
+
+    def as_dict(self) -> dict[str, Any]:
+        payload = self.payload
+        if payload is not None and not isinstance(payload, str):
+            payload = json.dumps(payload, separators=(",", ":"), default=str)
+        if payload is not None and len(payload) > TRACE_PAYLOAD_CHARS:
+            payload = payload[:TRACE_PAYLOAD_CHARS] + "..."
+        return {
+            "method": self.method,
+            "id": self.rpc_id,
+            "sent": self.sent,
+            "rtt_ms": round(self.rtt * 1000, 1) if self.rtt is not None else None,
+            "result": self.result,
+            "payload": payload,
+        }
+
+
+class RequestTrace:
+    """Fixed-size ring buffer of the last ``size`` exchanges.
+
+    Recording only overwrites the fields of a preallocated slot and keeps a
+    reference to the reply; serialisation and truncation happen at dump time.
+    """
+
+    def __init__(self, size: int = TRACE_SIZE) -> None:
+        self._slots = [TraceEntry() for _ in range(size)]
+        self._next = 0
+        self._count = 0
+
+    def record(
+        self,
+        method: str,
+        rpc_id: int | None,
+        sent: float,
+        rtt: float | None,
+        result: str,
+        payload: Any,
+    ) -> None:
+        slot = self._slots[self._next]
+        slot.method = method
+        slot.rpc_id = rpc_id
+        slot.sent = sent
+        slot.rtt = rtt
+        slot.result = result
+        slot.payload = payload
+        self._next = (self._next + 1) % len(self._slots)
+        if self._count < len(self._slots):
+            self._count += 1
+
+    def entries(self) -> list[dict[str, Any]]:
+        """Oldest first."""
+        size = len(self._slots)
+        start = (self._next - self._count) % size
+        return [self._slots[(start + i) % size].as_dict() for i in range(self._count)]
+
+    def as_jsonl(self) -> str:
+        return "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in self.entries())
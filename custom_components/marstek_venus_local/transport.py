@@ -0,0 +1,381 @@
+# custom_components/marstek_venus_local/transport.py
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import itertools
+import logging
+import socket
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from typing import Any
+
+from .codec import RequestEncoder, decode
+
+_LOGGER = logging.getLogger(__name__)
+
+# Minimum spacing between any two datagrams sent over the shared fleet endpoint.
+# It caps the fleet at 50 requests/s, so the first round of polls after startup
+# takes time linear in the number of units (about 60 ms per unit for three methods).
+_FLEET_SEND_SPACING = 0.02
+
+# Ids of requests that gave up waiting, remembered so a late reply can be attributed.
+_EXPIRED_IDS = 32
+
+
+class _ExpiredIds(OrderedDict[int, str]):
+    """Bounded id -> method map of abandoned requests."""
+
+    def remember(self, rpc_id: int, method: str) -> None:
+        self[rpc_id] = method
+        if len(self) > _EXPIRED_IDS:
+            self.popitem(last=False)
+
+
+class _VenusProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol that hands every reply to the owning transport."""
+
+    def __init__(self, owner: VenusUdpTransport | VenusFleetTransport) -> None:
+        self._owner = owner
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        self._owner._handle_datagram(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        self._owner._handle_error(exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._owner._handle_lost(exc)
+
+
+class VenusUdpTransport:
+    """Native asyncio UDP client; one connected endpoint per device, no executor threads."""
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self._host = host
+        self._port = port
+        self._timeout = float(timeout)
+        self._transport: asyncio.DatagramTransport | None = None
+        self._connecting: asyncio.Lock = asyncio.Lock()
+        self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._encoder = RequestEncoder()
+
+        # Replies that did not match any outstanding request (late, duplicate, foreign).
+        self.mismatched = 0
+        # Send-to-reply time of the last answered request, without any local queueing.
+        self.last_rtt: float | None = None
+        # Called with the method of a late reply (None if unknown).
+        self.on_mismatch: Callable[[str | None], None] | None = None
+        self._expired = _ExpiredIds()
+        self.last_id: int | None = None
+
+    async def _ensure_endpoint(self) -> asyncio.DatagramTransport:
+        async with self._connecting:
+            if self._transport is None or self._transport.is_closing():
+                loop = asyncio.get_running_loop()
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _VenusProtocol(self),
+                    remote_addr=(self._host, self._port),
+                )
+                self._transport = transport
+            return self._transport
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self._fail_pending(ConnectionError("transport closed"))
+
+    def _fail_pending(self, exc: Exception) -> None:
+        pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def _handle_datagram(self, data: bytes, addr: tuple[str, int]) -> None:
+        try:
+            parsed = decode(data)
+        except ValueError:
+            _LOGGER.debug("Dropping undecodable datagram from %s: %r", self._host, data[:64])
+            return
+
+        rpc_id = parsed.get("id") if isinstance(parsed, dict) else None
+        try:
+            fut = self._pending.pop(int(rpc_id))
+        except (KeyError, TypeError, ValueError):
+            fut = None
+
+        if fut is None or fut.done():
+            self.mismatched += 1
+            _LOGGER.debug("Dropping unmatched reply from %s (id=%r)", self._host, rpc_id)
+            if self.on_mismatch is not None:
+                self.on_mismatch(self._expired.pop(rpc_id, None) if isinstance(rpc_id, int) else None)
+            return
+        fut.set_result(parsed)
+
+    def _handle_error(self, exc: Exception) -> None:
+        # ICMP port unreachable etc.; fail fast instead of waiting for the timeout.
+        # The connected endpoint itself stays usable.
+        self._fail_pending(exc)
+
+    def _handle_lost(self, exc: Exception | None) -> None:
+        self._transport = None
+        self._fail_pending(exc or ConnectionError("connection lost"))
+
+    async def async_call(
+        self,
+        method: str,
+        params: dict[str, Any] | None = None,
+        timeout: float | None = None,
+    ) -> dict[str, Any]:
+        """Send one request and wait for the reply carrying the same id.
+
+        The endpoint survives timeouts; a late reply simply finds no pending
+        entry and is counted in ``mismatched``.
+        """
+        transport = await self._ensure_endpoint()
+        rpc_id = self.last_id = next(self._ids)
+        data = self._encoder.encode(rpc_id, method, params)
+
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future[dict[str, Any]] = loop.create_future()
+        self._pending[rpc_id] = fut
+        try:
+            transport.sendto(data)
+            sent = loop.time()
+            async with asyncio.timeout(self._timeout if timeout is None else timeout):
+                reply = await fut
+            self.last_rtt = loop.time() - sent
+            return reply
+        finally:
+            if self._pending.pop(rpc_id, None) is not None:
+                self._expired.remember(rpc_id, method)
+
+
+class VenusFleetTransport:
+    """One unconnected UDP endpoint multiplexing every configured device.
+
+    Replies are demultiplexed by source address and request id. Sends go
+    through a round-robin arbiter so a busy device cannot starve the others;
+    per-device pacing (min_request_gap) stays with each device's scheduler,
+    and each config entry still runs its own scheduler task. Only the socket
+    and the send order are shared.
+    """
+
+    def __init__(self, send_spacing: float = _FLEET_SEND_SPACING) -> None:
+        self._send_spacing = send_spacing
+        self._transport: asyncio.DatagramTransport | None = None
+        self._connecting = asyncio.Lock()
+        self._ids = itertools.count(1)
+        self._encoder = RequestEncoder()
+        self._pending: dict[tuple[str, int], asyncio.Future[dict[str, Any]]] = {}
+        self._devices: dict[tuple[str, int], FleetDeviceTransport] = {}
+        self._refs = 0
+
+        # Round-robin send arbitration: waiters per device, devices in turn order.
+        self._waiters: dict[FleetDeviceTransport, deque[asyncio.Future[None]]] = {}
+        self._turns: deque[FleetDeviceTransport] = deque()
+        self._next_send = 0.0
+        self._dispatch_handle: asyncio.TimerHandle | None = None
+
+        # Datagrams from addresses that belong to no registered device.
+        self.foreign = 0
+
+    def device(self, host: str, port: int, timeout: float) -> FleetDeviceTransport:
+        """Handle for one device; ``close()`` on the handle releases it."""
+        self._refs += 1
+        return FleetDeviceTransport(self, host, port, timeout)
+
+    def _release(self, device: FleetDeviceTransport) -> None:
+        if device.addr is not None and self._devices.get(device.addr) is device:
+            del self._devices[device.addr]
+        for fut in self._waiters.pop(device, ()):
+            fut.cancel()
+        self._refs -= 1
+        if self._refs <= 0 and self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    async def _ensure_endpoint(self) -> asyncio.DatagramTransport:
+        async with self._connecting:
+            if self._transport is None or self._transport.is_closing():
+                loop = asyncio.get_running_loop()
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _VenusProtocol(self),
+                    local_addr=("0.0.0.0", 0),
+                )
+                self._transport = transport
+            return self._transport
+
+    async def _register(self, device: FleetDeviceTransport) -> tuple[str, int]:
+        """Resolve the device to the (ip, port) its replies will come from."""
+        host = device.host
+        try:
+            ipaddress.IPv4Address(host)
+        except ValueError:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, device.port, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+            host = infos[0][4][0]
+        addr = (host, device.port)
+        self._devices[addr] = device
+        return addr
+
+    def _handle_datagram(self, data: bytes, addr: tuple[str, int]) -> None:
+        device = self._devices.get((addr[0], addr[1]))
+        if device is None:
+            self.foreign += 1
+            return
+        try:
+            parsed = decode(data)
+        except ValueError:
+            _LOGGER.debug("Dropping undecodable datagram from %s: %r", addr[0], data[:64])
+            return
+
+        rpc_id = parsed.get("id") if isinstance(parsed, dict) else None
+        try:
+            fut = self._pending.pop((addr[0], int(rpc_id)))
+        except (KeyError, TypeError, ValueError):
+            fut = None
+
+        if fut is None or fut.done():
+            device.mismatched += 1
+            _LOGGER.debug("Dropping unmatched reply from %s (id=%r)", addr[0], rpc_id)
+            if device.on_mismatch is not None:
+                device.on_mismatch(device._expired.pop(rpc_id, None) if isinstance(rpc_id, int) else None)
+            return
+        fut.set_result(parsed)
+
+    def _handle_error(self, exc: Exception) -> None:
+        # Unconnected socket: errors can't be attributed to a device, let timeouts handle it.
+        _LOGGER.debug("Fleet endpoint error: %s", exc)
+
+    def _handle_lost(self, exc: Exception | None) -> None:
+        self._transport = None
+
+    async def _async_send_slot(self, device: FleetDeviceTransport) -> None:
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(device, deque())
+        waiters.append(fut)
+        if device not in self._turns:
+            self._turns.append(device)
+        if self._dispatch_handle is None:
+            self._dispatch()
+        await fut
+
+    def _dispatch(self) -> None:
+        self._dispatch_handle = None
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if now < self._next_send:
+            self._dispatch_handle = loop.call_at(self._next_send, self._dispatch)
+            return
+
+        while self._turns:
+            device = self._turns.popleft()
+            waiters = self._waiters.get(device)
+            while waiters and waiters[0].done():
+                waiters.popleft()
+            if not waiters:
+                continue
+            waiters.popleft().set_result(None)
+            if waiters:
+                self._turns.append(device)
+            self._next_send = now + self._send_spacing
+            if self._turns:
+                self._dispatch_handle = loop.call_at(self._next_send, self._dispatch)
+            return
+
+    async def _async_call(
+        self,
+        device: FleetDeviceTransport,
+        method: str,
+        params: dict[str, Any] | None,
+        timeout: float,
+    ) -> dict[str, Any]:
+        transport = await self._ensure_endpoint()
+        if device.addr is None:
+            device.addr = await self._register(device)
+
+        rpc_id = device.last_id = next(self._ids)
+        data = self._encoder.encode(rpc_id, method, params)
+
+        await self._async_send_slot(device)
+
+        loop = asyncio.get_running_loop()
+        key = (device.addr[0], rpc_id)
+        fut: asyncio.Future[dict[str, Any]] = loop.create_future()
+        self._pending[key] = fut
+        try:
+            transport.sendto(data, device.addr)
+            sent = loop.time()
+            async with asyncio.timeout(timeout):
+                reply = await fut
+            device.last_rtt = loop.time() - sent
+            return reply
+        finally:
+            if self._pending.pop(key, None) is not None:
+                device._expired.remember(rpc_id, method)
+
+
+class FleetDeviceTransport:
+    """Per-device view of the fleet endpoint, interchangeable with VenusUdpTransport."""
+
+    def __init__(self, fleet: VenusFleetTransport, host: str, port: int, timeout: float) -> None:
+        self._fleet = fleet
+        self.host = host
+        self.port = port
+        self._timeout = float(timeout)
+        self.addr: tuple[str, int] | None = None
+        self.mismatched = 0
+        self.last_rtt: float | None = None
+        self.on_mismatch: Callable[[str | None], None] | None = None
+        self._expired = _ExpiredIds()
+        self.last_id: int | None = None
+        self._closed = False
+
+    async def async_call(
+        self,
+        method: str,
+        params: dict[str, Any] | None = None,
+        timeout: float | None = None,
+    ) -> dict[str, Any]:
+        if self._closed:
+            raise ConnectionError("transport closed")
+        return await self._fleet._async_call(
+            self, method, params, self._timeout if timeout is None else timeout
+        )
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._fleet._release(self)
+
+
+class RttEstimator:
+    """Smoothed RTT and variance (as in TCP, RFC 6298) giving an adaptive timeout.
+
+    Every retry uses a fresh request id, so each reply maps to exactly one
+    send and every sample is unambiguous (no Karn filtering needed).
+    """
+
+    def __init__(self, initial_rto: float, min_rto: float, max_rto: float) -> None:
+        self.min_rto = min_rto
+        self.max_rto = max(max_rto, min_rto)
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self.rto = min(max(initial_rto, self.min_rto), self.max_rto)
+
+    def sample(self, rtt: float) -> None:
+        if self.srtt is None or self.rttvar is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.rto = min(max(self.srtt + 4 * self.rttvar, self.min_rto), self.max_rto)
+
+    def backoff(self) -> None:
+        self.rto = min(self.rto * 2, self.max_rto)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"srtt": self.srtt, "rttvar": self.rttvar, "rto": self.rto}
@@ -0,0 +1,575 @@
+"""Benchmarks for the polling and entity-update hot path.
+
+Runs against scripts/venus_simulator.py on localhost and prints one JSON
+document, so results from two revisions can be diffed:
+
+    python scripts/benchmark.py --output before.json
+    git checkout my-branch
+    python scripts/benchmark.py --output after.json
+
+Needs Home Assistant importable (the integration's dev environment).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from venus_simulator import SimulatorConfig, VenusSimulator, async_start_fleet  # noqa: E402
+
+from custom_components.marstek_venus_local import codec  # noqa: E402
+from custom_components.marstek_venus_local.aggregates import Aggregates  # noqa: E402
+from custom_components.marstek_venus_local.coordinator import (  # noqa: E402
+    SchedulerConfig,
+    ValueCache,
+    VenusScheduler,
+    compile_path,
+    dig,
+    section_of,
+)
+from custom_components.marstek_venus_local.methods import METHODS_BY_KEY, POLL_METHODS  # noqa: E402
+from custom_components.marstek_venus_local.sensor import (  # noqa: E402
+    NO_HOLD_KEYS,
+    SENSORS,
+    MarstekVenusSensor,
+)
+from custom_components.marstek_venus_local.timeseries import SampleRing, TIMESERIES_CAPACITY  # noqa: E402
+from custom_components.marstek_venus_local.transport import VenusFleetTransport, VenusUdpTransport  # noqa: E402
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "p50_ms": pick(0.50) * 1000,
+        "p99_ms": pick(0.99) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+
+def _retained(build: Any, copies: int = 1000) -> int:
+    """Bytes kept alive per object ``build`` returns."""
+    tracemalloc.start()
+    kept = [build() for _ in range(copies)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size // copies
+
+
+async def bench_transport(port: int, requests: int) -> dict[str, Any]:
+    """Request/reply latency and throughput of the UDP transport."""
+    client = VenusUdpTransport("127.0.0.1", port, 1.0)
+    latencies: list[float] = []
+    try:
+        await client.async_call("ES.GetStatus", {"id": 0})  # endpoint setup
+        started = time.perf_counter()
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            await client.async_call("ES.GetStatus", {"id": 0})
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    finally:
+        client.close()
+    return {"requests": requests, "requests_per_s": requests / elapsed, **_percentiles(latencies)}
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    """Default executor that counts the jobs handed to it."""
+
+    jobs = 0
+
+    def submit(self, fn: Any, /, *args: Any, **kwargs: Any) -> Any:
+        self.jobs += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class _ExecutorUdpClient:
+    """The client before the asyncio transport: a blocking socket run in the executor."""
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect((host, port))
+        self._ids = 0
+
+    def _call(self, method: str, params: dict[str, Any] | None) -> dict[str, Any]:
+        self._ids += 1
+        self._sock.send(json.dumps({"id": self._ids, "method": method, "params": params}).encode("utf-8"))
+        return json.loads(self._sock.recv(65535).decode("utf-8"))
+
+    async def async_call(self, method: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        return await asyncio.get_running_loop().run_in_executor(None, self._call, method, params)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+async def bench_transport_paths(port: int, requests: int) -> dict[str, Any]:
+    """Executor-thread client (before) versus the asyncio transport (after).
+
+    Both send the same sequential ES.GetStatus requests; "executor_jobs" is
+    what each handed to the event loop's default executor.
+    """
+    loop = asyncio.get_running_loop()
+    out: dict[str, Any] = {}
+    for name, client in (
+        ("executor", _ExecutorUdpClient("127.0.0.1", port, 1.0)),
+        ("async", VenusUdpTransport("127.0.0.1", port, 1.0)),
+    ):
+        executor = _CountingExecutor()
+        loop.set_default_executor(executor)
+        latencies: list[float] = []
+        threads = threading.active_count()
+        try:
+            await client.async_call("ES.GetStatus", {"id": 0})  # socket/endpoint setup
+            executor.jobs = 0
+            cpu, started = time.process_time(), time.perf_counter()
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                await client.async_call("ES.GetStatus", {"id": 0})
+                latencies.append(time.perf_counter() - t0)
+                threads = max(threads, threading.active_count())
+            elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu
+        finally:
+            client.close()
+            executor.shutdown()
+        out[name] = {
+            "requests_per_s": requests / elapsed,
+            "cpu_us_per_request": cpu / requests * 1e6,
+            "executor_jobs": executor.jobs,
+            "threads": threads,
+            **_percentiles(latencies),
+        }
+    # Back to a plain default executor for the remaining benchmarks.
+    loop.set_default_executor(ThreadPoolExecutor())
+    return out
+
+
+async def bench_scheduler(port: int, ticks: int) -> dict[str, Any]:
+    """CPU time per VenusScheduler.tick, with every tick sending a request."""
+    cfg = SchedulerConfig(
+        intervals={m.method: 0 for m in POLL_METHODS},
+        min_request_gap=0.0,
+        udp_timeout=1.0,
+    )
+    scheduler = VenusScheduler(None, "127.0.0.1", port, cfg)  # type: ignore[arg-type]
+    cpu: list[float] = []
+    try:
+        await scheduler.tick()
+        for _ in range(ticks):
+            t0 = time.process_time()
+            await scheduler.tick()
+            cpu.append(time.process_time() - t0)
+    finally:
+        await scheduler.async_close()
+    return {
+        "ticks": ticks,
+        "cpu_us_per_tick": statistics.fmean(cpu) * 1e6,
+        "polled": scheduler.polled_methods(),
+    }
+
+
+class _BenchCoordinator:
+    """Just enough of MarstekVenusCoordinator for entities to read data."""
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.data = data
+        self.last_update_success = True
+        self.versions: dict[str, int] = {}
+        self.values = ValueCache(self)  # type: ignore[arg-type]
+
+    def section_version(self, section: str) -> int:
+        return self.versions.get(section, 0)
+
+
+async def bench_entities(port: int, updates: int) -> dict[str, Any]:
+    """Cost of one coordinator update fanned out to every sensor entity."""
+    cfg = SchedulerConfig(intervals={m.method: 0 for m in POLL_METHODS}, min_request_gap=0.0, udp_timeout=1.0)
+    scheduler = VenusScheduler(None, "127.0.0.1", port, cfg)  # type: ignore[arg-type]
+    try:
+        for _ in POLL_METHODS:
+            await scheduler.tick()
+    finally:
+        await scheduler.async_close()
+
+    coordinator = _BenchCoordinator(scheduler.data)
+    entities: list[MarstekVenusSensor] = []
+    for desc in SENSORS:
+        hold = desc.key not in NO_HOLD_KEYS
+        entities.append(MarstekVenusSensor(coordinator, "bench:30000", {}, desc, hold=hold))  # type: ignore[arg-type]
+
+    writes = 0
+
+    def _count_write() -> None:
+        nonlocal writes
+        writes += 1
+
+    for entity in entities:
+        entity.async_write_ha_state = _count_write  # type: ignore[method-assign]
+
+    sections = sorted({section_of(desc.path) for desc in SENSORS})
+    t0 = time.process_time()
+    for update in range(updates):
+        # One section changes per update, like one poll reply per tick.
+        section = sections[update % len(sections)]
+        coordinator.versions[section] = coordinator.versions.get(section, 0) + 1
+        for entity in entities:
+            entity._handle_coordinator_update()
+    fanout = time.process_time() - t0
+
+    t0 = time.process_time()
+    for _ in range(updates):
+        for entity in entities:
+            entity.native_value  # noqa: B018 - value cache + normalize
+    values = time.process_time() - t0
+
+    return {
+        "entities": len(entities),
+        "updates": updates,
+        "fanout_cpu_us_per_update": fanout / updates * 1e6,
+        "state_writes_per_update": writes / updates,
+        "native_value_cpu_us_per_update": values / updates * 1e6,
+    }
+
+
+class _SetpointSimulator(VenusSimulator):
+    """Records when each ES.SetMode reaches the device."""
+
+    def __init__(self, config: SimulatorConfig) -> None:
+        super().__init__(config)
+        self.set_mode_at: list[float] = []
+
+    def handle(self, method: str, params: Any) -> dict[str, Any] | None:
+        if method == "ES.SetMode":
+            self.set_mode_at.append(time.monotonic())
+        return super().handle(method, params)
+
+
+async def bench_setpoint(setpoints: int, gap: float) -> dict[str, Any]:
+    """End-to-end latency of passive setpoints while polls keep the link busy.
+
+    Every poll method is always due, so each setpoint is queued behind
+    whatever request is in flight. Reports enqueue -> ES.SetMode received by
+    the simulator ("wire") and enqueue -> confirmed by read-back ("verified").
+    """
+    device = _SetpointSimulator(SimulatorConfig(latency=0.005, unsupported=set(), seed=1))
+    _, port = await device.async_start("127.0.0.1", 0)
+    cfg = SchedulerConfig(intervals={m.method: 0 for m in POLL_METHODS}, min_request_gap=gap, udp_timeout=1.0)
+    scheduler = VenusScheduler(None, "127.0.0.1", port, cfg)  # type: ignore[arg-type]
+
+    async def run() -> None:
+        while True:
+            await scheduler.async_wait_due()
+            await scheduler.tick()
+
+    loop_task = asyncio.create_task(run())
+    wire: list[float] = []
+    verified: list[float] = []
+    try:
+        await asyncio.sleep(gap * 3)
+        for i in range(setpoints):
+            # land at a random point of the poll cycle
+            await asyncio.sleep(gap * ((i * 7919) % 13) / 13)
+            before = len(device.set_mode_at)
+            t0 = time.monotonic()
+            ok = await scheduler.async_set_passive_power(-100 - i, 60)
+            if not ok or len(device.set_mode_at) == before:
+                raise RuntimeError(f"setpoint {i} was not applied")
+            verified.append(time.monotonic() - t0)
+            wire.append(device.set_mode_at[before] - t0)
+        # an unchanged setpoint is answered without touching the wire
+        before = len(device.set_mode_at)
+        t0 = time.perf_counter()
+        await scheduler.async_set_passive_power(-100 - (setpoints - 1), 60)
+        dedupe = time.perf_counter() - t0
+        resent = len(device.set_mode_at) - before
+    finally:
+        loop_task.cancel()
+        await scheduler.async_close()
+        device.close()
+    return {
+        "setpoints": setpoints,
+        "min_request_gap_ms": gap * 1000,
+        "wire": _percentiles(wire),
+        "verified": _percentiles(verified),
+        "dedupe_us": dedupe * 1e6,
+        "dedupe_resent": resent,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench_fleet(unit_counts: list[int], seconds: float, interval: int) -> dict[str, Any]:
+    """Startup and steady-state cost of N units sharing one VenusFleetTransport.
+
+    N simulated units listen on 127.0.0.1..N. "startup" runs until every
+    unit answered its first ES/Bat/Mode polls; "steady" then polls each
+    method every ``interval`` seconds for ``seconds``. CPU time includes the
+    simulated units, which run in the same process.
+    """
+    out: dict[str, Any] = {}
+    for count in unit_counts:
+        port = _free_port()
+        devices = await async_start_fleet(count, SimulatorConfig(latency=0.0, unsupported=set(), seed=1), port)
+        fleet = VenusFleetTransport()
+        cfg = SchedulerConfig(
+            intervals={m.method: interval for m in POLL_METHODS}, min_request_gap=0.1, udp_timeout=1.0
+        )
+        schedulers = [
+            VenusScheduler(None, d.ip, port, cfg, client=fleet.device(d.ip, port, 1.0))  # type: ignore[arg-type]
+            for d in devices
+        ]
+
+        async def run(scheduler: VenusScheduler) -> None:
+            while True:
+                await scheduler.async_wait_due()
+                await scheduler.tick()
+
+        def sent(schedulers: list[VenusScheduler] = schedulers) -> int:
+            return sum(s.stats.summary()["sent"] for s in schedulers)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        tasks = [asyncio.create_task(run(s)) for s in schedulers]
+        try:
+            while not all(s.data["es"] and s.data["bat"] and s.data["mode"] for s in schedulers):
+                await asyncio.sleep(0.01)
+            startup_wall, startup_cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+            before = sent()
+            wall, cpu = time.perf_counter(), time.process_time()
+            await asyncio.sleep(seconds)
+            steady_wall, steady_cpu = time.perf_counter() - wall, time.process_time() - cpu
+            requests = sent() - before
+        finally:
+            for task in tasks:
+                task.cancel()
+            for scheduler in schedulers:
+                await scheduler.async_close()
+            for device in devices:
+                device.close()
+        out[str(count)] = {
+            "startup_s": startup_wall,
+            "startup_cpu_ms": startup_cpu * 1000,
+            "steady_requests_per_s": requests / steady_wall,
+            "steady_cpu_pct": steady_cpu / steady_wall * 100,
+            "cpu_us_per_request": steady_cpu / requests * 1e6 if requests else None,
+            "mismatched": sum(s.mismatched_replies for s in schedulers),
+            "foreign": fleet.foreign,
+        }
+    return out
+
+
+def bench_snapshots(reads: int) -> dict[str, Any]:
+    """Status snapshots + compiled accessors versus raw result dicts + dig."""
+    device = VenusSimulator(SimulatorConfig(unsupported=set(), seed=1))
+    keys = ("es", "bat", "mode")
+    raw = {
+        key: device.handle(METHODS_BY_KEY[key].method, {"id": 0}) for key in keys
+    }
+    decoded = {key: METHODS_BY_KEY[key].decode(result) for key, result in raw.items()}
+    paths = [desc.path for desc in SENSORS if desc.path.split(".", 1)[0] in keys]
+    readers = [compile_path(path) for path in paths]
+
+    t0 = time.process_time()
+    for _ in range(reads):
+        for path in paths:
+            dig(raw, path)
+    dig_cpu = time.process_time() - t0
+
+    t0 = time.process_time()
+    for _ in range(reads):
+        for read in readers:
+            read(decoded)
+    compiled_cpu = time.process_time() - t0
+
+    t0 = time.process_time()
+    for _ in range(reads):
+        for key, result in raw.items():
+            METHODS_BY_KEY[key].decode(result)
+    decode_cpu = time.process_time() - t0
+
+    return {
+        "paths": len(paths),
+        "dig_ns_per_read": dig_cpu / (reads * len(paths)) * 1e9,
+        "compiled_ns_per_read": compiled_cpu / (reads * len(paths)) * 1e9,
+        "decode_us_per_reply": decode_cpu / (reads * len(keys)) * 1e6,
+        "dict_bytes_per_es_bat_mode": _retained(lambda: {k: dict(v) for k, v in raw.items()}),
+        "snapshot_bytes_per_es_bat_mode": _retained(
+            lambda: {k: METHODS_BY_KEY[k].decode(v) for k, v in raw.items()}
+        ),
+    }
+
+
+def bench_codec(ops: int) -> dict[str, Any]:
+    """Request encoding and reply parsing: codec versus plain json per datagram."""
+    device = VenusSimulator(SimulatorConfig(unsupported=set(), seed=1))
+    params = {"id": 0}
+    reply = json.dumps({"id": 1, "src": "VenusE-0123456789ab", "result": device.handle("ES.GetStatus", params)}).encode()
+    encoder = codec.RequestEncoder()
+
+    def legacy_encode(rpc_id: int) -> bytes:
+        return json.dumps({"id": rpc_id, "method": "ES.GetStatus", "params": params}).encode("utf-8")
+
+    def legacy_decode(_: int) -> Any:
+        return json.loads(reply.decode("utf-8"))
+
+    def codec_encode(rpc_id: int) -> bytes:
+        return encoder.encode(rpc_id, "ES.GetStatus", params)
+
+    def codec_decode(_: int) -> Any:
+        return codec.decode(reply)
+
+    def measure(fn: Any) -> dict[str, float]:
+        t0 = time.perf_counter()
+        for i in range(ops):
+            fn(i)
+        elapsed = time.perf_counter() - t0
+        # Transient allocation per call: traced peak above the baseline.
+        tracemalloc.start()
+        peaks = []
+        for i in range(200):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        return {"ops_per_s": ops / elapsed, "peak_alloc_bytes": statistics.median(peaks)}
+
+    return {
+        "backend": codec.JSON_BACKEND,
+        "encode_json": measure(legacy_encode),
+        "encode_codec": measure(codec_encode),
+        "decode_json": measure(legacy_decode),
+        "decode_codec": measure(codec_decode),
+    }
+
+
+def bench_timeseries(samples: int) -> dict[str, Any]:
+    """SampleRing appends, queries and footprint, against a list of tuples."""
+    ring = SampleRing(TIMESERIES_CAPACITY)
+    t0 = time.perf_counter()
+    for i in range(samples):
+        ring.append(float(i), float(i % 1000))
+    append = time.perf_counter() - t0
+
+    end = float(samples)
+    queries = 1000
+    t0 = time.perf_counter()
+    for _ in range(queries):
+        ring.range(end - 60, end)
+    range_60 = (time.perf_counter() - t0) / queries
+    t0 = time.perf_counter()
+    for _ in range(100):
+        ring.downsample(60)
+    downsample = (time.perf_counter() - t0) / 100
+
+    def as_list() -> list[tuple[float, float]]:
+        return [(float(i), float(i % 1000)) for i in range(TIMESERIES_CAPACITY)]
+
+    return {
+        "capacity": ring.capacity,
+        "appends_per_s": samples / append,
+        "range_60_samples_us": range_60 * 1e6,
+        "downsample_full_us": downsample * 1e6,
+        "ring_bytes": _retained(lambda: SampleRing(TIMESERIES_CAPACITY), 20),
+        "tuple_list_bytes": _retained(as_list, 20),
+    }
+
+
+def bench_aggregates(samples: int) -> dict[str, Any]:
+    """Streaming es aggregates per sample, against rescanning the windows."""
+    aggregates = Aggregates()
+    statuses = [{"ongrid_power": (i * 7919) % 6001 - 3000} for i in range(samples)]
+    # One sample per 2 s keeps 150 samples in the 5 minute and 1800 in the 1 hour window.
+    t0 = time.perf_counter()
+    for i, status in enumerate(statuses):
+        aggregates.record("es", status, i * 2.0)
+    streaming = (time.perf_counter() - t0) / samples
+
+    history: list[tuple[float, float]] = []
+    rescans = min(samples, 3000)
+    t0 = time.perf_counter()
+    for i, status in enumerate(statuses[:rescans]):
+        now = i * 2.0
+        history.append((now, status["ongrid_power"]))
+        short = [v for ts, v in history if ts > now - 300]
+        long = sorted(v for ts, v in history if ts > now - 3600)
+        (sum(short) / len(short), min(short), max(short), long[int(0.95 * (len(long) - 1))])
+    rescan = (time.perf_counter() - t0) / rescans
+    return {"samples": samples, "streaming_us_per_sample": streaming * 1e6, "rescan_us_per_sample": rescan * 1e6}
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    device = VenusSimulator(SimulatorConfig(latency=0.0, unsupported=set(), seed=1))
+    _, port = await device.async_start("127.0.0.1", 0)
+    try:
+        return {
+            "python": platform.python_version(),
+            "transport": await bench_transport(port, args.requests),
+            "transport_paths": await bench_transport_paths(port, args.requests),
+            "scheduler": await bench_scheduler(port, args.ticks),
+            "entities": await bench_entities(port, args.updates),
+            "snapshots": bench_snapshots(args.reads),
+            "codec": bench_codec(args.codec_ops),
+            "timeseries": bench_timeseries(args.samples),
+            "aggregates": bench_aggregates(args.samples),
+            "setpoint": await bench_setpoint(args.setpoints, args.setpoint_gap),
+            "fleet": await bench_fleet(args.fleet_units, args.fleet_seconds, args.fleet_interval),
+        }
+    finally:
+        device.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=20000)
+    parser.add_argument("--codec-ops", type=int, default=50000)
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--setpoints", type=int, default=50)
+    parser.add_argument("--setpoint-gap", type=float, default=0.1, help="min_request_gap in seconds")
+    parser.add_argument(
+        "--fleet-units",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1, 5, 10, 20, 40],
+        help="comma-separated unit counts for the fleet benchmark",
+    )
+    parser.add_argument("--fleet-seconds", type=float, default=5.0)
+    parser.add_argument("--fleet-interval", type=int, default=5, help="poll interval per method in seconds")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    result = asyncio.run(_main(args))
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if args.output is not None:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Local Marstek Venus stand-in speaking the device's UDP JSON-RPC.
+
+Runs on localhost without hardware so the scheduler, discovery and the
+config-flow connection test can be exercised and benchmarked. Stdlib only.
+
+    python scripts/venus_simulator.py --count 3 --latency 0.05 --loss 0.1
+
+starts three devices on 127.0.0.1, 127.0.0.2 and 127.0.0.3 (port 30000).
+Use ``--host 0.0.0.0`` for a single device that also answers broadcast
+discovery on the LAN.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+_LOGGER = logging.getLogger("venus_simulator")
+
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+@dataclass
+class SimulatorConfig:
+    """Network behaviour and firmware quirks of one simulated device."""
+
+    # Reply delay: latency plus uniform jitter (seconds).
+    latency: float = 0.02
+    jitter: float = 0.0
+    # Probability a request gets no reply at all.
+    loss: float = 0.0
+    # Probability a reply is sent twice.
+    duplicate: float = 0.0
+    # Probability a reply is held back by ``reorder_delay`` so later replies overtake it.
+    reorder: float = 0.0
+    reorder_delay: float = 0.5
+
+    # Firmware quirks seen in the field (see VenusScheduler.async_set_mode).
+    # ES.SetMode Manual without manual_cfg is rejected.
+    require_manual_cfg: bool = True
+    # set_result as 1 / "true" instead of a JSON boolean.
+    set_result_style: str = "bool"  # "bool" | "int" | "str"
+    # ES.GetMode keeps reporting the previous mode for this long after ES.SetMode.
+    mode_apply_delay: float = 0.0
+    # Methods answered with "Method not found" / never answered.
+    unsupported: set[str] = field(default_factory=lambda: {"PV.GetStatus"})
+    silent: set[str] = field(default_factory=set)
+
+    model: str = "VenusE"
+    firmware: int = 153
+    seed: int | None = None
+
+
+class VenusSimulator(asyncio.DatagramProtocol):
+    """One simulated Venus unit with a little bit of battery physics."""
+
+    def __init__(self, config: SimulatorConfig | None = None, mac: str = "0123456789ab") -> None:
+        self.config = config or SimulatorConfig()
+        self.mac = mac
+        self._rng = random.Random(self.config.seed)
+        self._transport: asyncio.DatagramTransport | None = None
+        self.ip = "127.0.0.1"
+
+        self.rated_capacity = 5120.0
+        self.soc = 50.0
+        self.bat_temp = 24.0
+        self.mode = "Auto"
+        self._previous_mode = "Auto"
+        self._mode_changed = 0.0
+        self.passive_power = 0
+        self._passive_until = 0.0
+        self.manual_slots: dict[int, dict[str, Any]] = {}
+        self.load_power = 300.0
+        self.totals = {"total_grid_output_energy": 0.0, "total_grid_input_energy": 0.0, "total_load_energy": 0.0}
+        self._last_step = time.monotonic()
+
+        # Counters for benchmarks.
+        self.requests = 0
+        self.replies = 0
+        self.dropped = 0
+        self.methods: dict[str, int] = {}
+
+    # -- lifecycle -----------------------------------------------------------------
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 30000) -> tuple[str, int]:
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: self, local_addr=(host, port), allow_broadcast=True
+        )
+        self.ip = host
+        return transport.get_extra_info("sockname")[:2]
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport  # type: ignore[assignment]
+
+    # -- physics ----------------------------------------------------------------
+
+    def _ongrid_power(self, now: float) -> float:
+        """Positive: battery discharging into the house/grid; negative: charging."""
+        if self.mode == "Passive":
+            return float(self.passive_power) if now < self._passive_until else 0.0
+        if self.mode == "Manual":
+            return 0.0
+        return min(self.load_power, 800.0) if self.soc > 10 else 0.0
+
+    def _step(self) -> None:
+        now = time.monotonic()
+        dt = now - self._last_step
+        self._last_step = now
+        power = self._ongrid_power(now)
+        self.soc = min(100.0, max(0.0, self.soc - power * dt / 3600 / self.rated_capacity * 100))
+        wh = power * dt / 3600
+        if wh >= 0:
+            self.totals["total_grid_output_energy"] += wh
+        else:
+            self.totals["total_grid_input_energy"] -= wh
+        self.totals["total_load_energy"] += self.load_power * dt / 3600
+        self.load_power = max(0.0, self.load_power + self._rng.uniform(-20, 20))
+
+    # -- RPC ----------------------------------------------------------------------
+
+    def _set_result(self, ok: bool) -> Any:
+        style = self.config.set_result_style
+        if style == "int":
+            return 1 if ok else 0
+        if style == "str":
+            return "true" if ok else "false"
+        return ok
+
+    def _reported_mode(self, now: float) -> str:
+        if now - self._mode_changed < self.config.mode_apply_delay:
+            return self._previous_mode
+        return self.mode
+
+    def _set_mode(self, params: dict[str, Any]) -> dict[str, Any] | None:
+        cfg = params.get("config") if isinstance(params, dict) else None
+        if not isinstance(cfg, dict) or "mode" not in cfg:
+            return None
+        mode = cfg["mode"]
+        now = time.monotonic()
+        if mode == "Manual":
+            manual = cfg.get("manual_cfg")
+            if not isinstance(manual, dict):
+                if self.config.require_manual_cfg:
+                    return {"id": 0, "set_result": self._set_result(False)}
+            else:
+                self.manual_slots[int(manual.get("time_num", 0))] = dict(manual)
+        elif mode == "Passive":
+            passive = cfg.get("passive_cfg") or {}
+            self.passive_power = int(passive.get("power", 0))
+            self._passive_until = now + float(passive.get("cd_time", 300))
+        elif mode not in ("Auto", "AI"):
+            return {"id": 0, "set_result": self._set_result(False)}
+
+        if mode != self.mode:
+            self._previous_mode = self.mode
+            self._mode_changed = now
+        self.mode = mode
+        return {"id": 0, "set_result": self._set_result(True)}
+
+    def handle(self, method: str, params: Any) -> dict[str, Any] | None:
+        """Result dict, or None for invalid params."""
+        self._step()
+        now = time.monotonic()
+        ongrid = round(self._ongrid_power(now))
+        if method == "ES.GetStatus":
+            return {
+                "id": 0,
+                "bat_soc": round(self.soc),
+                "bat_cap": round(self.rated_capacity),
+                "pv_power": 0,
+                "ongrid_power": ongrid,
+                "offgrid_power": 0,
+                "bat_power": ongrid,
+                **{key: round(value) for key, value in self.totals.items()},
+            }
+        if method == "Bat.GetStatus":
+            return {
+                "id": 0,
+                "soc": round(self.soc),
+                "charg_flag": self.soc < 100,
+                "dischrg_flag": self.soc > 10,
+                "bat_temp": round(self.bat_temp, 1),
+                "bat_capacity": round(self.rated_capacity * self.soc / 100),
+                "rated_capacity": round(self.rated_capacity),
+            }
+        if method == "ES.GetMode":
+            return {"id": 0, "mode": self._reported_mode(now), "ongrid_power": ongrid, "offgrid_power": 0, "bat_soc": round(self.soc)}
+        if method == "ES.SetMode":
+            return self._set_mode(params)
+        if method == "EM.GetStatus":
+            return {"id": 0, "ct_state": 1, "a_power": round(self.load_power), "b_power": 0, "c_power": 0, "total_power": round(self.load_power - ongrid)}
+        if method == "Wifi.GetStatus":
+            return {"id": 0, "ssid": "simulated", "rssi": -55, "sta_ip": self.ip}
+        if method == "PV.GetStatus":
+            return {"id": 0, "pv_power": 0, "pv_voltage": 0, "pv_current": 0}
+        if method == "Marstek.GetDevice":
+            return {
+                "device": self.config.model,
+                "ver": self.config.firmware,
+                "ble_mac": self.mac,
+                "wifi_mac": self.mac,
+                "wifi_name": "simulated",
+                "ip": self.ip,
+            }
+        raise KeyError(method)
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        self.requests += 1
+        try:
+            request = json.loads(data)
+            rpc_id = request.get("id")
+            method = request["method"]
+        except (ValueError, KeyError, AttributeError):
+            self.dropped += 1
+            return
+        self.methods[method] = self.methods.get(method, 0) + 1
+
+        cfg = self.config
+        if method in cfg.silent or self._rng.random() < cfg.loss:
+            self.dropped += 1
+            return
+
+        reply: dict[str, Any] = {"id": rpc_id, "src": f"{cfg.model}-{self.mac}"}
+        if method in cfg.unsupported:
+            reply["error"] = {"code": METHOD_NOT_FOUND, "message": "Method not found"}
+        else:
+            try:
+                result = self.handle(method, request.get("params"))
+            except KeyError:
+                reply["error"] = {"code": METHOD_NOT_FOUND, "message": "Method not found"}
+            else:
+                if result is None:
+                    reply["error"] = {"code": INVALID_PARAMS, "message": "Invalid params"}
+                else:
+                    reply["result"] = result
+
+        payload = json.dumps(reply).encode("utf-8")
+        delay = cfg.latency + self._rng.uniform(0, cfg.jitter)
+        if self._rng.random() < cfg.reorder:
+            delay += cfg.reorder_delay
+        copies = 2 if self._rng.random() < cfg.duplicate else 1
+
+        loop = asyncio.get_running_loop()
+        for copy in range(copies):
+            loop.call_later(delay + copy * cfg.latency, self._send, payload, addr)
+
+    def _send(self, payload: bytes, addr: tuple[str, int]) -> None:
+        if self._transport is not None:
+            self.replies += 1
+            self._transport.sendto(payload, addr)
+
+
+async def async_start_fleet(
+    count: int,
+    config: SimulatorConfig | None = None,
+    port: int = 30000,
+) -> list[VenusSimulator]:
+    """Start ``count`` devices on 127.0.0.1, 127.0.0.2, ... sharing ``port``."""
+    devices = []
+    for index in range(count):
+        device = VenusSimulator(config, mac=f"5e{index:010x}")
+        await device.async_start(f"127.0.0.{index + 1}", port)
+        devices.append(device)
+    return devices
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--host", help="bind address for a single device (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=30000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0)
+    parser.add_argument("--duplicate", type=float, default=0.0)
+    parser.add_argument("--reorder", type=float, default=0.0)
+    parser.add_argument("--mode-apply-delay", type=float, default=0.0)
+    parser.add_argument("--set-result-style", choices=("bool", "int", "str"), default="bool")
+    parser.add_argument("--unsupported", nargs="*", default=["PV.GetStatus"])
+    parser.add_argument("--silent", nargs="*", default=[])
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args()
+
+
+async def _main() -> None:
+    args = _parse_args()
+    config = SimulatorConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        loss=args.loss,
+        duplicate=args.duplicate,
+        reorder=args.reorder,
+        mode_apply_delay=args.mode_apply_delay,
+        set_result_style=args.set_result_style,
+        unsupported=set(args.unsupported),
+        silent=set(args.silent),
+        seed=args.seed,
+    )
+    if args.host is not None:
+        device = VenusSimulator(config)
+        await device.async_start(args.host, args.port)
+        devices = [device]
+    else:
+        devices = await async_start_fleet(args.count, config, args.port)
+    for device in devices:
+        _LOGGER.info("Simulated Venus %s listening on %s:%s", device.mac, device.ip, args.port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for device in devices:
+            device.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,131 @@
+"""Closed-loop run of the zero-export controller against the simulator.
+
+A synthetic household load (base load, a kettle, a cycling fridge and a
+PV-like surplus) is metered at a fixed period; each reading goes through
+PiController and the resulting setpoint through VenusScheduler's write
+queue to scripts/venus_simulator.py, exactly as the integration does. The
+simulated grid power is load minus what the battery actually delivers.
+Prints one JSON document comparing the run with the uncontrolled load:
+
+    python scripts/zero_export_sim.py --duration 60 --gap 0.5
+    python scripts/zero_export_sim.py --soc 12   # discharge guard engaged
+
+Needs Home Assistant importable (the integration's dev environment).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from venus_simulator import SimulatorConfig, VenusSimulator  # noqa: E402
+
+from custom_components.marstek_venus_local.controller import ControllerConfig, PiController  # noqa: E402
+from custom_components.marstek_venus_local.coordinator import SchedulerConfig, VenusScheduler  # noqa: E402
+from custom_components.marstek_venus_local.methods import POLL_METHODS  # noqa: E402
+
+
+def load_profile(t: float, duration: float) -> float:
+    """Household load minus PV (W) at ``t`` seconds into the run; negative is surplus."""
+    load = 250.0 + 40.0 * math.sin(t / 3.0)
+    if 0.15 * duration <= t < 0.35 * duration:
+        load += 1800.0  # kettle
+    if int(t / 7.0) % 2:
+        load += 120.0  # fridge compressor
+    if t >= 0.6 * duration:
+        load -= 900.0  # sun comes out
+    return load
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    device = VenusSimulator(SimulatorConfig(latency=args.latency, unsupported=set(), seed=1))
+    device.soc = args.soc
+    _, port = await device.async_start("127.0.0.1", 0)
+    intervals = {m.method: m.default_interval for m in POLL_METHODS}
+    intervals["Bat.GetStatus"] = 5
+    scheduler = VenusScheduler(
+        None,  # type: ignore[arg-type]
+        "127.0.0.1",
+        port,
+        SchedulerConfig(intervals=intervals, min_request_gap=args.gap, udp_timeout=1.0),
+    )
+    pi = PiController(ControllerConfig(target=args.target, cd_time=60))
+
+    async def loop() -> None:
+        while True:
+            await scheduler.async_wait_due()
+            await scheduler.tick()
+
+    loop_task = asyncio.create_task(loop())
+    pending: set[asyncio.Task[bool]] = set()
+    grid: list[float] = []
+    baseline: list[float] = []
+    limited = 0
+    started = time.monotonic()
+    try:
+        while (t := time.monotonic() - started) < args.duration:
+            device.load_power = load_profile(t, args.duration)
+            delivered = device._ongrid_power(time.monotonic())
+            reading = device.load_power - delivered
+            grid.append(reading)
+            baseline.append(device.load_power)
+
+            setpoint = pi.update(reading, time.monotonic(), scheduler.data.get("bat"))
+            limited += pi.limited is not None
+            task = asyncio.create_task(scheduler.async_set_passive_power(setpoint, 60))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            await asyncio.sleep(args.meter_period)
+    finally:
+        loop_task.cancel()
+        for task in pending:
+            task.cancel()
+        await scheduler.async_close()
+        device.close()
+
+    def summary(samples: list[float]) -> dict[str, float]:
+        hours = args.meter_period / 3600
+        ordered = sorted(abs(value - args.target) for value in samples)
+        return {
+            "import_wh": sum(max(value, 0.0) for value in samples) * hours,
+            "export_wh": sum(-min(value, 0.0) for value in samples) * hours,
+            "mean_abs_error_w": sum(ordered) / len(ordered),
+            "p95_abs_error_w": ordered[int(0.95 * (len(ordered) - 1))],
+        }
+
+    return {
+        "duration_s": args.duration,
+        "meter_period_s": args.meter_period,
+        "min_request_gap_s": args.gap,
+        "start_soc": args.soc,
+        "controlled": summary(grid),
+        "uncontrolled": summary(baseline),
+        "setmode_sent": device.methods.get("ES.SetMode", 0),
+        "readings": len(grid),
+        "readings_limited": limited,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of real time")
+    parser.add_argument("--meter-period", type=float, default=1.0, help="seconds between meter readings")
+    parser.add_argument("--gap", type=float, default=0.5, help="min_request_gap in seconds")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated device reply delay")
+    parser.add_argument("--target", type=float, default=0.0, help="grid power to hold (W)")
+    parser.add_argument("--soc", type=float, default=50.0, help="starting state of charge (%%)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Helpers shared by the tests."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from venus_simulator import SimulatorConfig, VenusSimulator
+
+from custom_components.marstek_venus_local.coordinator import SchedulerConfig, VenusScheduler
+from custom_components.marstek_venus_local.methods import POLL_METHODS
+
+
+@asynccontextmanager
+async def running_scheduler(gap: float = 0.05) -> AsyncIterator[tuple[VenusScheduler, VenusSimulator]]:
+    """A simulated unit on localhost and a scheduler whose tick loop runs against it."""
+    device = VenusSimulator(SimulatorConfig(latency=0.005, unsupported=set(), seed=1))
+    _, port = await device.async_start("127.0.0.1", 0)
+    cfg = SchedulerConfig(intervals={m.method: 30 for m in POLL_METHODS}, min_request_gap=gap, udp_timeout=1.0)
+    scheduler = VenusScheduler(None, "127.0.0.1", port, cfg)  # type: ignore[arg-type]
+
+    async def loop() -> None:
+        while True:
+            await scheduler.async_wait_due()
+            await scheduler.tick()
+
+    task = asyncio.create_task(loop())
+    try:
+        yield scheduler, device
+    finally:
+        task.cancel()
+        await scheduler.async_close()
+        device.close()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# scripts/venus_simulator.py stands in for real units.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
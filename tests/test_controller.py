@@ -0,0 +1,129 @@
+"""Zero-export controller: PI loop guards and the setpoint keepalive."""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from custom_components.marstek_venus_local.controller import ControllerConfig, PiController, ZeroExportController
+from custom_components.marstek_venus_local.status import BatStatus
+
+from .common import running_scheduler
+
+
+def _settle(pi: PiController, load: float, start: float, steps: int, bat: Any = None) -> float:
+    """Feed ``steps`` one-second readings of a plant where the battery offsets load 1:1; the last grid power."""
+    grid = load - pi.output
+    for step in range(steps):
+        pi.update(grid, start + step, bat)
+        grid = load - pi.output
+    return grid
+
+
+def test_output_converges_on_import_and_export() -> None:
+    pi = PiController(ControllerConfig())
+    assert abs(_settle(pi, 800.0, 0.0, 30)) <= pi.cfg.deadband
+    assert pi.output > 0  # discharging covers the import
+
+    assert abs(_settle(pi, -600.0, 30.0, 30)) <= pi.cfg.deadband
+    assert pi.output < 0  # charging soaks up the surplus
+
+
+def test_output_respects_the_power_limit() -> None:
+    pi = PiController(ControllerConfig(max_power=500))
+    assert _settle(pi, 2000.0, 0.0, 30) == pytest.approx(1500.0)
+    assert pi.output == 500
+
+
+@pytest.mark.parametrize(
+    "bat",
+    [
+        {"soc": 10, "charg_flag": True, "dischrg_flag": True},
+        {"soc": 50, "charg_flag": True, "dischrg_flag": False},
+        {"soc": 50, "charg_flag": 1, "dischrg_flag": 0},
+        {"soc": 50, "charg_flag": "true", "dischrg_flag": "false"},
+    ],
+)
+def test_no_discharge_when_empty_or_flagged(bat: dict[str, Any]) -> None:
+    pi = PiController(ControllerConfig())
+    status = BatStatus({"id": 0, **bat})
+    grid = 800.0
+    for step in range(20):
+        pi.update(grid, float(step), status)
+        assert pi.output <= 0
+    assert pi.limited == "soc_low"
+
+
+@pytest.mark.parametrize(
+    "bat",
+    [
+        {"soc": 100, "charg_flag": True, "dischrg_flag": True},
+        {"soc": 50, "charg_flag": False, "dischrg_flag": True},
+        {"soc": 50, "charg_flag": 0, "dischrg_flag": 1},
+    ],
+)
+def test_no_charge_when_full_or_flagged(bat: dict[str, Any]) -> None:
+    pi = PiController(ControllerConfig())
+    status = BatStatus({"id": 0, **bat})
+    for step in range(20):
+        pi.update(-800.0, float(step), status)
+        assert pi.output >= 0
+    assert pi.limited == "soc_high"
+
+
+def test_temperature_guard_holds_zero() -> None:
+    pi = PiController(ControllerConfig())
+    for step in range(20):
+        pi.update(800.0, float(step), {"soc": 50, "bat_temp": 55})
+    assert pi.output == 0 and pi.limited == "temperature"
+
+
+class _Coordinator:
+    """What ZeroExportController uses of MarstekVenusCoordinator, backed by a real scheduler."""
+
+    def __init__(self, scheduler: Any) -> None:
+        self.scheduler = scheduler
+        self.host = scheduler.host
+        self.entry = SimpleNamespace(async_create_background_task=self._create_task)
+
+    @property
+    def data(self) -> dict[str, Any]:
+        return self.scheduler.data
+
+    @staticmethod
+    def _create_task(hass: Any, coro: Any, name: str) -> asyncio.Task[None]:
+        return asyncio.create_task(coro, name=name)
+
+    async def async_set_passive_power(self, power: int, cd_time: int) -> bool:
+        return await self.scheduler.async_set_passive_power(power, cd_time)
+
+
+def test_keepalive_keeps_the_device_countdown_running() -> None:
+    cd_time = 2
+
+    async def run() -> None:
+        async with running_scheduler() as (scheduler, device):
+            controller = ZeroExportController(
+                None, _Coordinator(scheduler), "sensor.grid", ControllerConfig(cd_time=cd_time)  # type: ignore[arg-type]
+            )
+            event = SimpleNamespace(data={"new_state": SimpleNamespace(state="800", attributes={})})
+            controller._async_grid_changed(event)  # type: ignore[arg-type]
+            await asyncio.sleep(0.5)
+            assert device.mode == "Passive"
+
+            # The meter stays quiet; only the keepalive (every cd_time / 3) runs.
+            slack = []
+            for _ in range(9):
+                await asyncio.sleep(cd_time / 3)
+                controller._async_keepalive(datetime.now())
+                slack.append(device._passive_until - time.monotonic())
+            assert min(slack) > 0
+            # Repeats within half a countdown were dropped, the rest refreshed it.
+            assert 3 <= device.methods["ES.SetMode"] <= 6
+            controller.async_stop()
+
+    asyncio.run(run())
@@ -0,0 +1,75 @@
+"""Discovery against simulated units on 127.0.0.1-3."""
+from __future__ import annotations
+
+import asyncio
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import aclosing
+from typing import Any
+
+from venus_simulator import SimulatorConfig, async_start_fleet
+
+from custom_components.marstek_venus_local.discovery import (
+    async_discover_devices,
+    async_iter_discover,
+    async_rediscover,
+    device_mac,
+)
+
+UNITS = 3
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _with_fleet(test: Callable[[int, list[Any]], Awaitable[None]]) -> None:
+    async def run() -> None:
+        port = _free_port()
+        devices = await async_start_fleet(UNITS, SimulatorConfig(latency=0.01), port)
+        try:
+            await test(port, devices)
+        finally:
+            for device in devices:
+                device.close()
+
+    asyncio.run(run())
+
+
+def test_subnet_sweep_finds_every_unit() -> None:
+    async def test(port: int, devices: list[Any]) -> None:
+        started = time.monotonic()
+        found = await async_discover_devices(None, port, 2.0, subnet="127.0.0.0/28", idle=0.5)  # type: ignore[arg-type]
+        elapsed = time.monotonic() - started
+
+        assert sorted(info["ip"] for info in found) == ["127.0.0.1", "127.0.0.2", "127.0.0.3"]
+        assert {device_mac(info) for info in found} == {device.mac for device in devices}
+        # Returns once no further unit answered for ``idle``, well before the 2 s window.
+        assert elapsed < 1.5
+
+    _with_fleet(test)
+
+
+def test_iter_discover_yields_as_units_answer() -> None:
+    async def test(port: int, devices: list[Any]) -> None:
+        started = time.monotonic()
+        async with aclosing(async_iter_discover(None, port, 2.0, subnet="127.0.0.0/28")) as found:  # type: ignore[arg-type]
+            first = await anext(aiter(found))
+        assert first["ip"].startswith("127.0.0.")
+        assert time.monotonic() - started < 0.5
+
+    _with_fleet(test)
+
+
+def test_rediscover_finds_a_unit_that_moved() -> None:
+    async def test(port: int, devices: list[Any]) -> None:
+        moved = devices[1]
+        info = await async_rediscover(None, moved.mac, port, last_ip="127.0.0.9", timeout=1.0)  # type: ignore[arg-type]
+        assert info is not None and info["ip"] == "127.0.0.2"
+
+        assert await async_rediscover(None, "5effffffffff", port, last_ip="127.0.0.9", timeout=0.2) is None  # type: ignore[arg-type]
+
+    _with_fleet(test)
@@ -0,0 +1,48 @@
+"""Manual week schedule against a simulated unit."""
+from __future__ import annotations
+
+import asyncio
+
+from .common import running_scheduler
+
+SCHEDULE = [{"time_num": 1, "start_time": "17:00", "end_time": "21:00", "power": 800}]
+
+
+def test_unchanged_schedule_still_switches_to_manual() -> None:
+    async def run() -> None:
+        async with running_scheduler() as (scheduler, device):
+            result = await scheduler.async_set_manual_schedule(SCHEDULE)
+            assert result["written"] == list(range(10)) and device.mode == "Manual"
+
+            # Nothing differs and the unit is in Manual: nothing is sent.
+            sent = device.methods.get("ES.SetMode", 0)
+            assert (await scheduler.async_set_manual_schedule(SCHEDULE))["written"] == []
+            assert device.methods.get("ES.SetMode", 0) == sent
+
+            # Nothing differs but the unit left Manual: one slot goes out again.
+            assert await scheduler.async_set_mode("Auto")
+            sent = device.methods.get("ES.SetMode", 0)
+            result = await scheduler.async_set_manual_schedule(SCHEDULE)
+            assert result == {"written": [1], "failed": [], "unchanged": [0, 2, 3, 4, 5, 6, 7, 8, 9]}
+            assert device.methods["ES.SetMode"] == sent + 1
+            assert device.mode == "Manual" and scheduler.data["mode"].get("mode") == "Manual"
+
+    asyncio.run(run())
+
+
+def test_replaced_manual_mode_leaves_its_slot_uncached() -> None:
+    async def run() -> None:
+        async with running_scheduler(gap=0.3) as (scheduler, device):
+            await asyncio.sleep(1.0)  # first polls out of the way
+            manual = asyncio.create_task(scheduler.async_set_mode("Manual"))
+            await asyncio.sleep(0)
+            assert await scheduler.async_set_passive_power(-300, 60)
+            assert await manual is False
+            assert 9 not in device.manual_slots
+            assert "9" not in (scheduler.data.get("manual") or {})
+
+            # So the next schedule writes slot 9 instead of trusting a stale copy.
+            result = await scheduler.async_set_manual_schedule(SCHEDULE)
+            assert 9 in result["written"]
+
+    asyncio.run(run())
@@ -0,0 +1,215 @@
+"""VenusScheduler driven by a simulated clock and a scripted client."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from custom_components.marstek_venus_local.coordinator import SchedulerConfig, VenusScheduler
+from custom_components.marstek_venus_local.methods import POLL_METHODS
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    """Answers every call at once, or times out (advancing the clock) while ``online`` is False."""
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.online = True
+        # method -> JSON-RPC error code to answer with
+        self.errors: dict[str, int] = {}
+        self.calls: list[tuple[float, str]] = []
+        self.mismatched = 0
+        self.on_mismatch = None
+        self.last_id: int | None = None
+        self.last_rtt: float | None = None
+
+    async def async_call(self, method: str, params: dict[str, Any] | None = None, timeout: float | None = None) -> dict[str, Any]:
+        self.calls.append((self.clock.now, method))
+        self.last_id = len(self.calls)
+        if not self.online:
+            self.clock.now += timeout or 0.0
+            raise TimeoutError
+        self.last_rtt = 0.01
+        if method in self.errors:
+            return {"id": self.last_id, "error": {"code": self.errors[method], "message": "error"}}
+        return {"id": self.last_id, "result": {"id": 0}}
+
+    def close(self) -> None:
+        pass
+
+
+def _scheduler(gap: float = 0.5) -> tuple[VenusScheduler, FakeClock, FakeClient]:
+    clock = FakeClock()
+    client = FakeClient(clock)
+    cfg = SchedulerConfig(
+        intervals={m.method: m.default_interval for m in POLL_METHODS},
+        min_request_gap=gap,
+        udp_timeout=1.0,
+    )
+    return VenusScheduler(None, "127.0.0.1", 30000, cfg, clock=clock, client=client), clock, client  # type: ignore[arg-type]
+
+
+async def _run_until(scheduler: VenusScheduler, clock: FakeClock, end: float) -> None:
+    """Tick at every wakeup, jumping the clock forward in between."""
+    for _ in range(1000):
+        wakeup = scheduler.next_wakeup()
+        if wakeup > end:
+            return
+        clock.now = max(clock.now, wakeup)
+        await scheduler.tick()
+    raise AssertionError("scheduler keeps waking up without sending")
+
+
+def test_open_breaker_sends_one_probe_per_backoff() -> None:
+    async def run() -> None:
+        scheduler, clock, client = _scheduler()
+        client.online = False
+        start = clock.now
+        await _run_until(scheduler, clock, start + 200)
+
+        assert scheduler.breaker_open
+        # Three polls (each with its retries) open the breaker; from then on a
+        # single attempt goes out whenever the backoff (10, 20, 40, 80 s,
+        # counted from the previous 1 s timeout) expires.
+        opened = client.calls[8][0] + 1.0
+        probes = [ts - opened for ts, _ in client.calls[9:]]
+        assert probes == [10.0, 31.0, 72.0, 153.0]
+        assert scheduler.reliability_state()["breaker_backoff"] == 160.0
+
+        # The next probe that gets an answer closes the breaker.
+        client.online = True
+        await _run_until(scheduler, clock, clock.now + 200)
+        assert not scheduler.breaker_open
+
+    asyncio.run(run())
+
+
+def _polling(es: int, bat: int, mode: int, gap: float) -> tuple[VenusScheduler, FakeClock, FakeClient]:
+    scheduler, clock, client = _scheduler(gap)
+    scheduler.cfg.intervals.update({"ES.GetStatus": es, "Bat.GetStatus": bat, "ES.GetMode": mode})
+    return scheduler, clock, client
+
+
+def test_first_polls_go_out_in_priority_order_min_gap_apart() -> None:
+    async def run() -> None:
+        scheduler, clock, client = _polling(10, 30, 60, gap=2)
+        start = clock.now
+        assert scheduler.next_wakeup() == start
+
+        await _run_until(scheduler, clock, start + 5)
+        assert client.calls == [
+            (start, "ES.GetStatus"),
+            (start + 2, "Bat.GetStatus"),
+            (start + 4, "ES.GetMode"),
+        ]
+        # Everything is polled; the next deadline is ES.GetStatus's.
+        assert scheduler.next_wakeup() == start + 10
+
+    asyncio.run(run())
+
+
+def test_each_method_keeps_its_own_deadline() -> None:
+    async def run() -> None:
+        scheduler, clock, client = _polling(10, 30, 60, gap=2)
+        start = clock.now
+        await _run_until(scheduler, clock, start + 125)
+
+        def sent(method: str) -> list[float]:
+            return [ts - start for ts, m in client.calls if m == method]
+
+        # Rescheduled one interval after each answer, from the time it was sent.
+        assert sent("ES.GetStatus") == [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120]
+        assert sent("Bat.GetStatus") == [2, 32, 62, 92, 122]
+        # Due at 64 but ES.GetStatus went out at 60 and Bat.GetStatus at 62.
+        assert sent("ES.GetMode") == [4, 64, 124]
+
+    asyncio.run(run())
+
+
+def test_min_request_gap_spaces_coinciding_deadlines() -> None:
+    async def run() -> None:
+        scheduler, clock, client = _polling(5, 5, 5, gap=3)
+        start = clock.now
+        await _run_until(scheduler, clock, start + 60)
+
+        times = [ts for ts, _ in client.calls]
+        assert all(b - a >= 3 for a, b in zip(times, times[1:]))
+        # Three methods every 5 s cannot fit in a 3 s gap: the link is saturated
+        # and the polls round-robin instead of starving the lowest priority.
+        counts = {m: sum(1 for _, c in client.calls if c == m) for m in ("ES.GetStatus", "Bat.GetStatus", "ES.GetMode")}
+        assert len(times) == 21
+        assert max(counts.values()) - min(counts.values()) <= 1
+
+    asyncio.run(run())
+
+
+def test_next_wakeup_waits_for_the_gap_and_new_consumers() -> None:
+    async def run() -> None:
+        scheduler, clock, client = _polling(10, 30, 60, gap=2)
+        start = clock.now
+        await scheduler.tick()
+        # ES.GetStatus just went out; Bat.GetStatus is due but must wait for the gap.
+        assert scheduler.next_wakeup() == start + 2
+        clock.now = start + 1
+        await scheduler.tick()
+        assert len(client.calls) == 1
+
+        await _run_until(scheduler, clock, start + 5)
+        # A newly consumed method is due at once, still behind the gap.
+        clock.now = start + 6
+        scheduler.add_consumer("EM.GetStatus")
+        assert scheduler.next_wakeup() == start + 6
+        await scheduler.tick()
+        assert client.calls[-1] == (start + 6, "EM.GetStatus")
+        assert scheduler.next_wakeup() == start + 10
+
+    asyncio.run(run())
+
+
+class FakeCapabilityCache:
+    def __init__(self) -> None:
+        self.stored: dict[Any, set[str]] = {}
+
+    async def async_get(self, identity: str, firmware: str | None) -> set[str] | None:
+        return None
+
+    async def async_set(self, key: Any, unsupported: set[str]) -> None:
+        self.stored[key] = unsupported
+
+
+def test_offline_capability_probe_records_nothing() -> None:
+    async def run() -> None:
+        scheduler, clock, client = _scheduler(gap=0)
+        client.online = False
+        await scheduler.async_probe_capabilities(FakeCapabilityCache())  # type: ignore[arg-type]
+        assert scheduler.capabilities_source is None
+
+        # The coordinator probes again once the unit answers.
+        client.online = True
+        await scheduler.async_probe_capabilities(FakeCapabilityCache())  # type: ignore[arg-type]
+        assert scheduler.capabilities_source == "probe"
+        assert scheduler.unsupported == set()
+
+    asyncio.run(run())
+
+
+def test_only_method_not_found_marks_a_method_unsupported() -> None:
+    async def run() -> None:
+        scheduler, clock, client = _scheduler(gap=0)
+        client.errors = {"PV.GetStatus": -32601, "Wifi.GetStatus": -32603, "ES.GetMode": -32601}
+        cache = FakeCapabilityCache()
+        await scheduler.async_probe_capabilities(cache)  # type: ignore[arg-type]
+
+        assert scheduler.capabilities_source == "probe"
+        # An internal error is undecided; a core status method is never dropped.
+        assert scheduler.unsupported == {"PV.GetStatus"}
+        assert "ES.GetMode" in scheduler.polled_methods()
+
+    asyncio.run(run())
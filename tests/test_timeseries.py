@@ -0,0 +1,22 @@
+"""SampleRing ordering when the clock steps backwards."""
+from __future__ import annotations
+
+from custom_components.marstek_venus_local.timeseries import SampleRing, TimeSeries
+
+
+def test_ring_clamps_older_samples() -> None:
+    ring = SampleRing(4)
+    for ts, value in ((10.0, 1), (20.0, 2), (5.0, 3), (30.0, 4), (25.0, 5)):
+        ring.append(ts, value)
+    stamps = [ts for ts, _ in ring.range()]
+    assert stamps == [20.0, 20.0, 30.0, 30.0]
+    assert [v for _, v in ring.range(20.0, 30.0)] == [2, 3]
+
+
+def test_series_stamps_do_not_follow_wall_clock(monkeypatch) -> None:
+    series = TimeSeries(8)
+    series.record("bat", {"soc": 50}, 100.0)
+    monkeypatch.setattr("time.time", lambda: 0.0)
+    series.record("bat", {"soc": 51}, 101.0)
+    (first, _), (second, _) = series.get("bat.soc").range()
+    assert second - first == 1.0
@@ -0,0 +1,69 @@
+"""Write queue coalescing against a simulated unit."""
+from __future__ import annotations
+
+import asyncio
+
+from .common import running_scheduler
+
+
+def test_replaced_command_of_another_kind_returns_false() -> None:
+    async def run() -> None:
+        async with running_scheduler(gap=0.3) as (scheduler, device):
+            await asyncio.sleep(1.0)  # first polls out of the way
+            # Both use the "mode" key; the passive setpoint replaces Manual before it is sent.
+            manual = asyncio.create_task(scheduler.async_set_mode("Manual"))
+            await asyncio.sleep(0)
+            passive = asyncio.create_task(scheduler.async_set_passive_power(-300, 60))
+            assert await manual is False
+            assert await passive is True
+            assert device.mode == "Passive"
+
+    asyncio.run(run())
+
+
+def test_replaced_identical_command_shares_the_outcome() -> None:
+    async def run() -> None:
+        async with running_scheduler(gap=0.3) as (scheduler, device):
+            await asyncio.sleep(1.0)
+            # AI goes out at once; both Auto calls queue behind it and coalesce.
+            ai = asyncio.create_task(scheduler.async_set_mode("AI"))
+            await asyncio.sleep(0.05)
+            first = asyncio.create_task(scheduler.async_set_mode("Auto"))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(scheduler.async_set_mode("Auto"))
+            assert await asyncio.gather(ai, first, second) == [False, True, True]
+            assert device.methods["ES.SetMode"] == 2
+            assert device.mode == "Auto"
+
+    asyncio.run(run())
+
+
+def test_write_returns_false_when_the_tick_loop_is_gone() -> None:
+    async def run() -> None:
+        async with running_scheduler() as (scheduler, device):
+            await asyncio.sleep(0.5)
+        # running_scheduler stopped the loop; a write must not wait forever.
+        scheduler._write_budget = lambda: 0.2  # type: ignore[method-assign]
+        assert await scheduler.async_set_mode("Auto") is False
+        assert "mode" not in scheduler._writes
+
+    asyncio.run(run())
+
+
+def test_passive_setpoint_follows_mode_and_countdown() -> None:
+    async def run() -> None:
+        async with running_scheduler() as (scheduler, device):
+            assert await scheduler.async_set_passive_power(-300, 60)
+            assert scheduler.passive_setpoint == -300
+
+            # A manual slot moves the unit to Manual.
+            await scheduler.async_set_manual_schedule([])
+            assert scheduler.passive_setpoint is None
+
+            # A short countdown runs out and the unit falls back.
+            assert await scheduler.async_set_passive_power(200, 1)
+            assert scheduler.passive_setpoint == 200
+            await asyncio.sleep(1.1)
+            assert scheduler.passive_setpoint is None
+
+    asyncio.run(run())